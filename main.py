@@ -11,26 +11,31 @@ from http.server import BaseHTTPRequestHandler, HTTPServer # python3
 import socketserver 
 import time
 import random
-import gc  # garbage collector
 import argparse
+import concurrent.futures
 import math
 import numpy as np
 import utilities.chain as c
+import utilities.columnar as col
 import utilities.communication as comm
 import utilities.generator_WATERS as waters
 import utilities.generator_UUNIFAST as uunifast
 import utilities.transformer as trans
 import utilities.event_simulator as es
+import utilities.schedule as sch
 import utilities.analyzer as a
+import utilities.storage as storage
+import utilities.cache as cch
 import utilities.evaluation as eva
 import json
 import os
 import utilities.task as Task
 import utilities.chain as Chain
-import sys
 import traceback
 
 debug_flag = False  # flag to have breakpoint() when errors occur
+# Results of our analyses and Kloda at the chains (see analyzeTaskSets()).
+chain_results = ('our_age', 'our_red_age', 'our_react', 'kloda')
 unitscale = 1
 class end2endServer(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
@@ -71,7 +76,8 @@ class end2endServer(BaseHTTPRequestHandler):
             elif (len(system.get("DependencyStore")) == 0):
                 self._set_error_headers("No dependencies in the system")
             else:
-                schedule = scheduleLetSynchronise(system)
+                schedule = scheduleLetSynchronise(system,
+                                                  cache=self.server.cache)
                 if (schedule == None):
                     self._set_error_headers("Schedule is empty")
                 else:
@@ -104,9 +110,22 @@ def main():
     parser.add_argument("-r", type=int, default=1)
     
     parser.add_argument("-f", type=str, default="")
+    # analysis on the stream of simulated jobs (only for args.j==1 and 5):
+    parser.add_argument("-s", type=int, default=0)
+    # directory of the result cache, empty for no cache (only for args.j==0,
+    # 1, 5 and 6):
+    parser.add_argument("-c", type=str, default="")
+    # number of worker processes for the task sets (only for args.j==1 and 5):
+    parser.add_argument("-w", type=int, default=1)
+    # number of worker processes for the chains of one task set, cannot be
+    # combined with -w (only for args.j==1 and 5):
+    parser.add_argument("-p", type=int, default=1)
 
     args = parser.parse_args()
+    if args.w > 1 and args.p > 1:
+        parser.error("-w and -p cannot be combined")
     del parser
+    cache = cch.ResultCache(args.c) if args.c else None
     if (not os.path.exists('output/1single')):
         os.makedirs('output/1single');
     if (not os.path.exists('output/2interconn')):
@@ -120,6 +139,7 @@ def main():
         hostName = "localhost"
         serverPort = 8080
         webServer = HTTPServer((hostName, serverPort), end2endServer)
+        webServer.cache = cache
         print("Server started http://%s:%s" % (hostName, serverPort))
 
         try:
@@ -139,6 +159,9 @@ def main():
         -r : number of runs
         -n : name of the run
 
+        Optional arguments:
+        -s : 1 to analyze the simulated jobs on the fly (bounded memory)
+
         Create task sets and cause-effect chains, use TDA, Davare, Duerr, our
         analysis, Kloda, and save the Data
         """
@@ -226,7 +249,10 @@ def main():
 
     
 
-        task_sets, ce_chains = singleECUAnalysis(task_sets, ce_chains)
+        task_sets, ce_chains = singleECUAnalysis(task_sets, ce_chains,
+                                                 stream=bool(args.s),
+                                                 cache=cache, workers=args.w,
+                                                 chain_workers=args.p)
 
         ###
         # Save data.
@@ -234,10 +260,10 @@ def main():
         print("=Save data.=")
 
         try:
-            np.savez("output/1single/task_set_u="+str(args.u)
-                     + "_n=" + str(args.n)
-                     + "_g=" + str(args.g) + ".npz", task_sets=task_sets,
-                     chains=ce_chains)
+            storage.save_task_sets(
+                    "output/1single/task_set_u=" + str(args.u)
+                    + "_n=" + str(args.n) + "_g=" + str(args.g),
+                    task_sets, ce_chains)
         except Exception as e:
             print(e)
             print("ERROR: save")
@@ -276,19 +302,13 @@ def main():
             chains_single_ECU = []
             for i in range(num_runs):
                 name_of_the_run = str(i)
-                data = np.load(
+                _, ce_chains = storage.load_task_sets(
                         "output/1single/task_set_u=" + str(utilization)
                         + "_n=" + name_of_the_run
-                        + "_g=" + str(gen_setting)
-                        + ".npz", allow_pickle=True)
-                for chain_set in data.f.chains:
+                        + "_g=" + str(gen_setting))
+                for chain_set in ce_chains:
                     for chain in chain_set:
                         chains_single_ECU.append(chain)
-
-                # Close data file and run the garbage collector.
-                data.close()
-                del data
-                gc.collect()
         except Exception as e:
             print(e)
             print("ERROR: inputs from single are missing")
@@ -334,27 +354,33 @@ def main():
         print("=Analyses (Davare, Duerr, Our).=")
         analyzer = a.Analyzer("0")
 
+        # Columnar form of the chains, shared by Davare and Duerr.
+        columns = col.ChainColumns(chains_inter)
+
         print("Test: Davare.")
-        analyzer.davare([chains_inter])
+        columns.store('davare', analyzer.davare(columns))
 
         print("Test: Duerr.")
-        analyzer.reaction_duerr([chains_inter])
-        analyzer.age_duerr([chains_inter])
+        columns.store('duerr_react', analyzer.reaction_duerr(columns))
+        columns.store('duerr_age', analyzer.age_duerr(columns))
 
         print("Test: Our.")
         # Our test can only be used when the single processor tests are already
         # done.
-        analyzer.max_age_inter_our(chains_inter, reduced=True)
-        analyzer.reaction_inter_our(chains_inter)
+        inter_columns = col.InterconnectedColumns(chains_inter)
+        inter_columns.store('inter_our_red_age', analyzer.max_age_inter_our(
+                inter_columns, reduced=True))
+        inter_columns.store('inter_our_react',
+                            analyzer.reaction_inter_our(inter_columns))
 
         ###
         # Save data.
         ###
         print("=Save data.=")
-        np.savez(
+        storage.save_interconnected(
                 "./output/2interconn/chains_" + "u=" + str(utilization)
-                + "_g=" + str(gen_setting) + ".npz",
-                chains_inter=chains_inter, chains_single_ECU=chains_single_ECU)
+                + "_g=" + str(gen_setting),
+                chains_inter, chains_single_ECU)
 
     elif args.j == 3:
         """Evaluation.
@@ -375,22 +401,17 @@ def main():
             chains_single_ECU = []
             chains_inter = []
             for ut in utilizations:
-                data = np.load(
+                inter, single = storage.load_interconnected(
                         "output/2interconn/chains_" + "u=" + str(ut)
-                        + "_g=" + str(args.g) + ".npz", allow_pickle=True)
+                        + "_g=" + str(args.g))
 
                 # Single ECU.
-                for chain in data.f.chains_single_ECU:
+                for chain in single:
                     chains_single_ECU.append(chain)
 
                 # Interconnected.
-                for chain in data.f.chains_inter:
+                for chain in inter:
                     chains_inter.append(chain)
-
-                # Close data file and run the garbage collector.
-                data.close()
-                del data
-                gc.collect()
         except Exception as e:
             print(e)
             print("ERROR: inputs for plotter are missing")
@@ -465,25 +486,13 @@ def main():
             #chains_inter = []
             #python main.py -j4 -g1 -u50 -n0
             #python main.py -j4 -g0 -u50 -n0
-            data = np.load(
+            task_sets, chains = storage.load_task_sets(
                     "output/1single/task_set_" + "u=" + str(args.u)
-                    + "_n=" + str(args.n) + "_g=" + str(args.g) + ".npz", allow_pickle=True)
+                    + "_n=" + str(args.n) + "_g=" + str(args.g))
 
-            print(data.f)
-            task_sets = data.f.task_sets
-            chains = data.f.chains
-            
             system = export_letsSyncrhonise_json(task_sets, chains, None)
             with open('output/LetSynchronise/system.json', 'w') as outfile:
                 json.dump(system, outfile, indent=4)
-                # Interconnected.
-            #for chain in data.f.chains_inter:
-            #    chains_inter.append(chain)
-
-            # Close data file and run the garbage collector.
-            data.close()
-            del data
-            gc.collect()
         except Exception as e:
             print(e)
             if debug_flag:
@@ -500,55 +509,20 @@ def main():
             #chains_inter = []
             #python main.py -j5 -g1 -u50 -n0
             #python main.py -j5 -g0 -u50 -n0
-            data = np.load(
+            task_sets, chains = storage.load_task_sets(
                     "output/1single/task_set_" + "u=" + str(args.u)
-                    + "_n=" + str(args.n) + "_g=" + str(args.g) + ".npz", allow_pickle=True)
-
-            print(data.f)
-            #tasks_single_ECU = [] 
-            #chains_single_ECU = []
-            #for chain_set in data.f.chains:
-            #    for chain in chain_set:
-            #        chain.davare = 0  # Davare
-            #        chain.duerr_age = 0  # Duerr max data age
-            #        chain.duerr_react = 0  # Duerr max reaction time
-            #        chain.our_age = 0  # Our max data age
-            #        chain.our_react = 0  # Our max reaction time
-            #        chain.our_red_age = 0  # Our reduced max data age
-            #        chain.inter_our_age = 0  # Our max data age for interconn
-            #        chain.inter_our_red_age = 0  # Our reduced max data age for interconn
-            #        chain.inter_our_react = 0  # Our max reaction time for interconn
-            #        chain.kloda = 0  # Kloda
-            #for task_set in data.f.task_sets:
-            #    for task in task_set:
-
-            #        tasks_single_ECU.append(task)
-            #        chains_single_ECU.append(chain)
-            task_sets = data.f.task_sets
-            chains = data.f.chains
-
-            #for set in task_sets:
-            #    for s in set:
-            #        s.rt = 0
-            #        print(s)
-            #for c in chains:
-            #    for s in c:
-            #        print(s)
-            #for task_set in data.f.task_sets:
-            #    for task in task_set:
-            #        tasks_single_ECU.append(task)
+                    + "_n=" + str(args.n) + "_g=" + str(args.g))
 
             print("===Begin analysis===")
             #print(task_sets)
             #print(chains)
             relink_chains(task_sets, chains)
             #ce_chains = waters.gen_ce_chains(task_sets)
-            task_sets, chains = singleECUAnalysis(task_sets, chains)
-            
-            # Close data file and run the garbage collector.
-            data.close()
-            del data
-            gc.collect()
+            task_sets, chains = singleECUAnalysis(task_sets, chains,
+                                                  stream=bool(args.s),
+                                                  cache=cache,
+                                                  workers=args.w,
+                                                  chain_workers=args.p)
         except Exception as e:
             print(e)
             if debug_flag:
@@ -564,7 +538,7 @@ def main():
         #f = open('output/LetSynchronise/system.json')
         f = open(args.f)
         system = json.load(f)
-        scheduleLetSynchronise(system)
+        scheduleLetSynchronise(system, cache=cache)
 def getDependencyInstances(system, name):
     for d in system["DependencyInstancesStore"]: 
         if d['name'] == name:
@@ -578,7 +552,7 @@ def getNextDependencyInstance(system, dependencyInstName, afterTime):
             return inst
     return None  
     
-def scheduleLetSynchronise(system):
+def scheduleLetSynchronise(system, cache=None):
     
     #"ConstraintStore" , "DependencyStore", "EventChainStore", "SystemInputStore", "SystemOutputStore", "TaskStore" 
     task_set = []
@@ -617,8 +591,8 @@ def scheduleLetSynchronise(system):
     #Create System Task for LetSynchronise
     id_counter = 0
     task_id_map["__system"] = id_counter
-    #wcet is smallest non-zero value
-    task_set.insert(0,Task.Task(task_id=id_counter, task_phase=0, task_bcet=0, task_wcet=sys.float_info.min, task_period=task_gcd_period, task_deadline=task_gcd_period, priority=id_counter, message=False))
+    #wcet is zero, the integer-tick simulator schedules it as marker job
+    task_set.insert(0,Task.Task(task_id=id_counter, task_phase=0, task_bcet=0, task_wcet=0, task_period=task_gcd_period, task_deadline=task_gcd_period, priority=id_counter, message=False))
     id_task_map[str(id_counter)] = {"name":"__system"}
     
     print (id_task_map)
@@ -646,7 +620,8 @@ def scheduleLetSynchronise(system):
     ce_chains = [chains] #single chain set
 
     #task_sets, chains = singleECUAnalysis(task_sets, ce_chains)
-    schedules, task_sets, chains = scheduleSingleECUAnalysis(task_sets, ce_chains)
+    schedules, task_sets, chains = scheduleSingleECUAnalysis(
+            task_sets, ce_chains, cache=cache)
     
 
     
@@ -779,8 +754,6 @@ def scheduleLetSynchronise(system):
         for i in range(0, len(parameters)):
             fo.write("j"+str(i)+" - " + "start: "+str(parameters[i][0]) + " end: " +str(parameters[i][1])+"\n")
             starttime = parameters[i][0]
-            if (starttime == sys.float_info.min):
-                starttime = 0
             endtime = parameters[i][1]
             taskInstance = {
                 "instance" : i,
@@ -1103,117 +1076,75 @@ def relink_chains(task_sets, chains):
 
     return ce_chains
     
-def scheduleSingleECUAnalysis(task_sets, ce_chains):
+def scheduleSingleECUAnalysis(task_sets, ce_chains, cache=None,
+                              workers=1, chain_workers=1):
+    analyzer = a.Analyzer("0")
+
+    # Simulators of the task sets with results in the cache (by id of the
+    # task set).
+    cached = dict()
+    if cache is not None:
+        for task_set, chains in zip(task_sets, ce_chains):
+            simulator = cache.restore_simulator(task_set, chains, 'schedule')
+            if (simulator is not None
+                    and cache.restore(task_set, chains, 'schedule')):
+                cached[id(task_set)] = simulator
+
     ###
     # First analyses (TDA, Davare, Duerr).
     ###
     print("=First analyses (TDA, Davare, Duerr).=")
-    analyzer = a.Analyzer("0")
 
     try:
-        # TDA for each task set.
+        # TDA for all task sets at once.
         print("TDA.")
-        for idxx in range(len(task_sets)):
-            try:
-                # TDA.
-                i = 1
-                for task in task_sets[idxx]:
-                    # Prevent WCET = 0 since the scheduler can
-                    # not handle this yet. This case can occur due to
-                    # rounding with the transformer.
-                    if task.wcet == 0:
-                        raise ValueError("WCET == 0")
-                    task.rt = analyzer.tda(task, task_sets[idxx][:(i - 1)])
-                    if task.rt > task.deadline:
-                        raise ValueError(
-                                    "TDA Result: WCRT bigger than deadline!")
-                    i += 1
-            except ValueError:
-                # If TDA fails, remove task and chain set and continue.
-                task_sets.remove(task_sets[idxx])
-                ce_chains.remove(ce_chains[idxx])
-                continue
+        analyzer.tda_task_sets([task_set for task_set in task_sets
+                                if id(task_set) not in cached])
+        # If TDA fails (WCRT bigger than deadline), remove task and chain
+        # set. WCET = 0 is allowed here (e.g., for the __system task),
+        # since the integer-tick scheduler can handle it.
+        passed = [all(task.rt <= task.deadline for task in task_set)
+                  for task_set in task_sets]
+        task_sets = [task_set for task_set, ok in zip(task_sets, passed) if ok]
+        ce_chains = [chains for chains, ok in zip(ce_chains, passed) if ok]
              
         # End-to-End Analyses. 
         # These results are used to for schedule computation
-        res = analyzer.davare(ce_chains)
-        res = analyzer.reaction_duerr(ce_chains)
-        res = analyzer.age_duerr(ce_chains)
+        new_chains = [chains for task_set, chains in zip(task_sets, ce_chains)
+                      if id(task_set) not in cached]
+        res = analyzer.davare(new_chains)
+        res = analyzer.reaction_duerr(new_chains)
+        res = analyzer.age_duerr(new_chains)
 
 
         ###
         # Second analyses (Simulation, Our, Kloda).
         ###
         print("=Second analyses (Simulation, Our, Kloda).=")
-        i = 0  # task set counter
         schedules = []
-        for task_set in task_sets:
-            print("=Task set ", i+1)
-
-            # Skip if there is no corresponding cause-effect chain.
-            if len(ce_chains[i]) == 0:
+        # Skip task sets without corresponding cause-effect chain and task
+        # sets with results in the cache.
+        jobs = [(task_set, chains)
+                for task_set, chains in zip(task_sets, ce_chains)
+                if len(chains) > 0 and id(task_set) not in cached]
+        simulators = iter(analyzeTaskSets(scheduleTaskSetAnalysis, jobs,
+                                          workers=workers,
+                                          chain_workers=chain_workers))
+        for task_set, chains in zip(task_sets, ce_chains):
+            if len(chains) == 0:
                 continue
-
-            # Event-based simulation.
-            print("Simulation.")
-
-            simulator = es.eventSimulator(task_set)
-            # Determination of the variables used to compute the stop
-            # condition of the simulation
-            max_e2e_latency = max(ce_chains[i], key=lambda chain:
-                                      chain.davare).davare
-            max_phase = max(task_set, key=lambda task: task.phase).phase
-            max_period = max(task_set, key=lambda task: task.period).period
-            hyper_period = analyzer.determine_hyper_period(task_set)
-
-            sched_interval = (
-                        2 * hyper_period + max_phase  # interval from paper
-                        + max_e2e_latency  # upper bound job chain length
-                        + max_period)  # for convenience
-
-            # Information for end user.
-            print("\tNumber of tasks: ", len(task_set))
-            print("\tHyperperiod: ", hyper_period)
-            number_of_jobs = 0
-            for task in task_set:
-                number_of_jobs += sched_interval/task.period
-            print("\tNumber of jobs to schedule: ",
-                      "%.2f" % number_of_jobs)
-
-            # Stop condition: Number of jobs of lowest priority task.
-            simulator.dispatcher(
-                        int(math.ceil(sched_interval/task_set[-1].period)))
-            
-            # Simulation without early completion.
-            schedule = simulator.e2e_result()
+            if id(task_set) in cached:
+                schedules.append(cached[id(task_set)])
+                continue
+            simulator = next(simulators)
+            # The simulator of a worker process refers to copies of the
+            # tasks.
+            simulator.tasks = simulator.trace.tasks = task_set
             schedules.append(simulator) #output raw simulator
-
-            # Analyses.
-            for chain in ce_chains[i]:
-                print("Test: Our Data Age.")
-                analyzer.max_age_our(schedule, task_set, chain, max_phase,
-                                     hyper_period, reduced=False)
-                analyzer.max_age_our(schedule, task_set, chain, max_phase,
-                                     hyper_period, reduced=True)
-
-                print("Test: Our Reaction Time.")
-                analyzer.reaction_our(schedule, task_set, chain, max_phase,
-                                      hyper_period)
-
-                # Kloda analysis, assuming synchronous releases.
-                print("Test: Kloda.")
-                analyzer.kloda(chain, hyper_period)
-
-                # Test.
-                if chain.kloda < chain.our_react:
-                    if debug_flag:
-                        breakpoint()
-                    else:
-                        raise ValueError(
-                                ".kloda is shorter than .our_react")
-            i += 1
-
-        
+            if cache is not None:
+                cache.store_simulator(task_set, chains, 'schedule',
+                                      simulator)
+                cache.store(task_set, chains, 'schedule')
 
         return schedules,task_sets,ce_chains
     except Exception as e:
@@ -1228,123 +1159,82 @@ def scheduleSingleECUAnalysis(task_sets, ce_chains):
     #1 task set will return 1 schedule.
     return schedules,task_sets,ce_chains
     
-def singleECUAnalysis(task_sets, ce_chains):
+def singleECUAnalysis(task_sets, ce_chains, stream=False, cache=None,
+                      workers=1, chain_workers=1):
+    """Analyses for the single ECU case.
+
+    With stream=True, our analyses are done during the simulation on the
+    stream of finished jobs instead of on the complete schedule.
+    With a cache (utilities.cache.ResultCache), the results of task sets
+    that were analyzed before are taken from the cache and new results are
+    added to it.
+    With workers > 1, the simulations and our analyses of the task sets are
+    done in a pool of worker processes (see analyzeTaskSets()). With
+    chain_workers > 1, the chains of each task set are analyzed in a pool of
+    worker processes (see analyzeChains()). Only one of them can be bigger
+    than 1.
+    """
+    analyzer = a.Analyzer("0")
+
+    # Task sets with results in the cache (by id of the task set).
+    cached = set()
+    if cache is not None:
+        for task_set, chains in zip(task_sets, ce_chains):
+            if cache.restore(task_set, chains, 'single'):
+                cached.add(id(task_set))
+
     ###
     # First analyses (TDA, Davare, Duerr).
     ###
     print("=First analyses (TDA, Davare, Duerr).=")
-    analyzer = a.Analyzer("0")
 
     try:
-        # TDA for each task set.
+        # TDA for all task sets at once.
         print("TDA.")
-        for idxx in range(len(task_sets)):
-            try:
-                # TDA.
-                i = 1
-                for task in task_sets[idxx]:
-                    # Prevent WCET = 0 since the scheduler can
-                    # not handle this yet. This case can occur due to
-                    # rounding with the transformer.
-                    if task.wcet == 0:
-                        raise ValueError("WCET == 0")
-                    task.rt = analyzer.tda(task, task_sets[idxx][:(i - 1)])
-                    if task.rt > task.deadline:
-                        raise ValueError(
-                                    "TDA Result: WCRT bigger than deadline!")
-                    i += 1
-            except ValueError:
-                # If TDA fails, remove task and chain set and continue.
-                task_sets.remove(task_sets[idxx])
-                ce_chains.remove(ce_chains[idxx])
-                continue
+        analyzer.tda_task_sets([task_set for task_set in task_sets
+                                if id(task_set) not in cached])
+        # If TDA fails (WCRT bigger than deadline), remove task and chain
+        # set. Task sets with WCET = 0 are removed as well, as in the
+        # original evaluation, such that the results stay comparable. This
+        # case can occur due to rounding with the transformer. (The
+        # integer-tick simulator itself can handle WCET = 0, see
+        # scheduleSingleECUAnalysis().)
+        passed = [all(task.wcet != 0 and task.rt <= task.deadline
+                      for task in task_set)
+                  for task_set in task_sets]
+        task_sets = [task_set for task_set, ok in zip(task_sets, passed) if ok]
+        ce_chains = [chains for chains, ok in zip(ce_chains, passed) if ok]
              
         # End-to-End Analyses.
+        new_chains = [chains for task_set, chains in zip(task_sets, ce_chains)
+                      if id(task_set) not in cached]
         print("Test: Davare.")
-        res = analyzer.davare(ce_chains)
+        res = analyzer.davare(new_chains)
         print("Davare End-to-End: "+ str(res))
 
 
         print("Test: Duerr Reaction Time.")
-        res = analyzer.reaction_duerr(ce_chains)
+        res = analyzer.reaction_duerr(new_chains)
         print("Duerr Reaction Time: "+ str(res))
 
         print("Test: Duerr Data Age.")
-        res = analyzer.age_duerr(ce_chains)
+        res = analyzer.age_duerr(new_chains)
         print("Duerr Data Age: "+ str(res))
 
         ###
         # Second analyses (Simulation, Our, Kloda).
         ###
         print("=Second analyses (Simulation, Our, Kloda).=")
-        i = 0  # task set counter
-        schedules = []
-        for task_set in task_sets:
-            print("=Task set ", i+1)
-
-            # Skip if there is no corresponding cause-effect chain.
-            if len(ce_chains[i]) == 0:
-                continue
-
-            # Event-based simulation.
-            print("Simulation.")
-
-            simulator = es.eventSimulator(task_set)
-            # Determination of the variables used to compute the stop
-            # condition of the simulation
-            max_e2e_latency = max(ce_chains[i], key=lambda chain:
-                                      chain.davare).davare
-            max_phase = max(task_set, key=lambda task: task.phase).phase
-            max_period = max(task_set, key=lambda task: task.period).period
-            hyper_period = analyzer.determine_hyper_period(task_set)
-
-            sched_interval = (
-                        2 * hyper_period + max_phase  # interval from paper
-                        + max_e2e_latency  # upper bound job chain length
-                        + max_period)  # for convenience
-
-            # Information for end user.
-            print("\tNumber of tasks: ", len(task_set))
-            print("\tHyperperiod: ", hyper_period)
-            number_of_jobs = 0
-            for task in task_set:
-                number_of_jobs += sched_interval/task.period
-            print("\tNumber of jobs to schedule: ",
-                      "%.2f" % number_of_jobs)
-
-            # Stop condition: Number of jobs of lowest priority task.
-            simulator.dispatcher(
-                        int(math.ceil(sched_interval/task_set[-1].period)))
-
-            # Simulation without early completion.
-            schedule = simulator.e2e_result()
-            schedules.append(schedule) #output raw simulator
-
-            # Analyses.
-            for chain in ce_chains[i]:
-                print("Test: Our Data Age.")
-                res = analyzer.max_age_our(schedule, task_set, chain, max_phase,
-                                         hyper_period, reduced=False)
-                print("Our Data Age One:" + str(res))
-                res = analyzer.max_age_our(schedule, task_set, chain, max_phase,
-                                         hyper_period, reduced=True)
-                print("Our Data Age Two:" + str(res))
-                print("Test: Our Reaction Time.")
-                res = analyzer.reaction_our(schedule, task_set, chain, max_phase,
-                                          hyper_period)
-                print("Our Reaction Time:" + str(res))
-                    # Kloda analysis, assuming synchronous releases.
-                print("Test: Kloda.")
-                res = analyzer.kloda(chain, hyper_period)
-                print("Kloda Analysis:" + str(res))
-                    # Test.
-                if chain.kloda < chain.our_react:
-                    if debug_flag:
-                        breakpoint()
-                    else:
-                        raise ValueError(
-                                    ".kloda is shorter than .our_react")
-            i += 1
+        # Skip task sets without corresponding cause-effect chain and task
+        # sets with results in the cache.
+        jobs = [(task_set, chains)
+                for task_set, chains in zip(task_sets, ce_chains)
+                if len(chains) > 0 and id(task_set) not in cached]
+        analyzeTaskSets(singleTaskSetAnalysis, jobs, workers=workers,
+                        stream=stream, chain_workers=chain_workers)
+        if cache is not None:
+            for task_set, chains in jobs:
+                cache.store(task_set, chains, 'single')
     except Exception as e:
         print(e)
         print("ERROR: analysis")
@@ -1354,5 +1244,280 @@ def singleECUAnalysis(task_sets, ce_chains):
             task_sets = []
             ce_chains = []
     return task_sets,ce_chains
+
+
+def analyzeTaskSets(analysis, jobs, workers=1, chain_workers=1, **kwargs):
+    """Call analysis(task_set, chains, **kwargs) for all task sets.
+
+    jobs is a list of pairs (task_set, chains). With workers > 1, the task
+    sets are distributed to a pool of worker processes. The workers analyze
+    copies of the task sets and chains; the results of our analyses and
+    Kloda are copied back to the chains. With chain_workers > 1, the task
+    sets are analyzed one after the other and the chains of each task set
+    are distributed to one pool of chain_workers processes, which is
+    created once for all task sets (see analyzeChains()). Only one of
+    workers and chain_workers can be bigger than 1. The return values of
+    analysis are returned in the order of jobs.
+    """
+    if workers > 1 and chain_workers > 1:
+        raise ValueError("Task sets and chains cannot both be analyzed in"
+                         " parallel.")
+    if workers <= 1:
+        if chain_workers <= 1 or len(jobs) == 0:
+            return [analysis(task_set, chains, **kwargs)
+                    for task_set, chains in _numbered(jobs)]
+        with concurrent.futures.ProcessPoolExecutor(chain_workers) as pool:
+            return [analysis(task_set, chains, chain_workers=chain_workers,
+                             chain_pool=pool, **kwargs)
+                    for task_set, chains in _numbered(jobs)]
+
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        outputs = pool.map(
+                _analyzeTaskSetWorker,
+                [(analysis, task_set, chains, kwargs)
+                 for task_set, chains in jobs])
+        for (task_set, chains), (result, values) in zip(jobs, outputs):
+            for chain, chain_values in zip(chains, values):
+                for name, value in zip(chain_results, chain_values):
+                    setattr(chain, name, value)
+            results.append(result)
+    return results
+
+
+def _numbered(jobs):
+    """Iterate over jobs and print the number of each task set."""
+    for idx, job in enumerate(jobs):
+        print("=Task set ", idx+1)
+        yield job
+
+
+def _analyzeTaskSetWorker(job):
+    """Analysis of one task set in a worker process (see analyzeTaskSets)."""
+    analysis, task_set, chains, kwargs = job
+    result = analysis(task_set, chains, **kwargs)
+    return result, [[getattr(chain, name) for name in chain_results]
+                    for chain in chains]
+
+
+def scheduleTaskSetAnalysis(task_set, chains, chain_workers=1,
+                            chain_pool=None):
+    """Simulation of the complete task set, our analyses and Kloda.
+
+    The chains are analyzed by chain_workers processes, in chain_pool if
+    given (see analyzeChains()). Returns the simulator.
+    """
+    analyzer = a.Analyzer("0")
+
+    # Event-based simulation.
+    print("Simulation.")
+
+    simulator = es.eventSimulator(task_set, int_ticks=True)
+    # Determination of the variables used to compute the stop
+    # condition of the simulation
+    max_e2e_latency = max(chains, key=lambda chain: chain.davare).davare
+    max_phase = max(task_set, key=lambda task: task.phase).phase
+    max_period = max(task_set, key=lambda task: task.period).period
+    hyper_period = analyzer.determine_hyper_period(task_set)
+
+    sched_interval = (
+                2 * hyper_period + max_phase  # interval from paper
+                + max_e2e_latency  # upper bound job chain length
+                + max_period)  # for convenience
+
+    # Information for end user.
+    print("\tNumber of tasks: ", len(task_set))
+    print("\tHyperperiod: ", hyper_period)
+    number_of_jobs = 0
+    for task in task_set:
+        number_of_jobs += sched_interval/task.period
+    print("\tNumber of jobs to schedule: ", "%.2f" % number_of_jobs)
+
+    # Stop condition: Number of jobs of lowest priority task.
+    # The schedule is repeated when it becomes periodic.
+    simulator.dispatcher(
+                int(math.ceil(sched_interval/task_set[-1].period)),
+                replicate=True)
+
+    # Simulation without early completion.
+    schedule = simulator.e2e_arrays()
+
+    # Analyses.
+    analyzeChains(schedule, task_set, chains, max_phase, hyper_period,
+                  workers=chain_workers, pool=chain_pool)
+    return simulator
+
+
+def singleTaskSetAnalysis(task_set, chains, stream=False, chain_workers=1,
+                          chain_pool=None):
+    """Simulation of the relevant tasks, our analyses and Kloda.
+
+    With stream=True, our analyses are done during the simulation on the
+    stream of finished jobs instead of on the complete schedule. Otherwise,
+    the chains are analyzed by chain_workers processes, in chain_pool if
+    given (see analyzeChains()).
+    """
+    analyzer = a.Analyzer("0")
+
+    # Event-based simulation.
+    print("Simulation.")
+
+    # Only tasks with higher priority than the lowest priority task of
+    # the cause-effect chains influence the chains. Lower priority
+    # tasks are not simulated.
+    lowest = max(task_set.index(task) for chain in chains
+                 for task in chain.chain)
+    sim_task_set = task_set[:lowest + 1]
+
+    simulator = es.eventSimulator(sim_task_set, int_ticks=True)
+    # Determination of the variables used to compute the stop
+    # condition of the simulation
+    max_e2e_latency = max(chains, key=lambda chain: chain.davare).davare
+    max_phase = max(task_set, key=lambda task: task.phase).phase
+    max_period = max(task_set, key=lambda task: task.period).period
+    hyper_period = analyzer.determine_hyper_period(task_set)
+
+    sched_interval = (
+                2 * hyper_period + max_phase  # interval from paper
+                + max_e2e_latency  # upper bound job chain length
+                + max_period)  # for convenience
+
+    # Information for end user.
+    print("\tNumber of tasks: ", len(task_set))
+    print("\tNumber of simulated tasks: ", len(sim_task_set))
+    print("\tHyperperiod: ", hyper_period)
+    number_of_jobs = 0
+    for task in sim_task_set:
+        number_of_jobs += sched_interval/task.period
+    print("\tNumber of jobs to schedule: ", "%.2f" % number_of_jobs)
+
+    # Stop condition: Number of jobs of lowest priority simulated
+    # task.
+    targeted_number = int(
+                math.ceil(sched_interval/sim_task_set[-1].period))
+
+    # The maximal first read depends on all tasks. It is obtained
+    # from the beginning of the schedule of the complete task set.
+    if len(sim_task_set) < len(task_set):
+        max_first_read = max(es.eventSimulator(
+                task_set, int_ticks=True).firstStarts())
+    elif stream:
+        max_first_read = max(simulator.firstStarts())
+    else:
+        max_first_read = None
+
+    if stream:
+        # The jobs are analyzed during the simulation. Only the jobs
+        # needed for further job chains are kept.
+        print("Test: Our Data Age and Reaction Time (stream).")
+        res = analyzer.our_stream(
+                simulator.jobStream(targeted_number), sim_task_set,
+                chains, max_phase, hyper_period, max_first_read)
+        print("Our Data Age One, Two, Reaction Time:" + str(res))
+    else:
+        # The schedule is repeated when it becomes periodic.
+        simulator.dispatcher(targeted_number, replicate=True)
+
+        # Simulation without early completion.
+        schedule = simulator.e2e_arrays()
+
+    # Analyses.
+    if stream:
+        for chain in chains:
+            chainAnalysis(None, task_set, chain, max_phase, hyper_period)
+    else:
+        analyzeChains(schedule, task_set, chains, max_phase, hyper_period,
+                      max_first_read=max_first_read, workers=chain_workers,
+                      pool=chain_pool)
+
+
+def chainAnalysis(schedule, task_set, chain, max_phase, hyper_period,
+                  max_first_read=None):
+    """Our analyses and Kloda for one chain.
+
+    If schedule is None, only Kloda is done (e.g., because our analyses
+    were done on the stream of simulated jobs).
+    """
+    analyzer = a.Analyzer("0")
+    if schedule is not None:
+        print("Test: Our Data Age.")
+        res = analyzer.max_age_our_vectorized(
+                schedule, task_set, chain, max_phase,
+                hyper_period, reduced=False,
+                max_first_read=max_first_read)
+        print("Our Data Age One:" + str(res))
+        res = analyzer.max_age_our_vectorized(
+                schedule, task_set, chain, max_phase,
+                hyper_period, reduced=True,
+                max_first_read=max_first_read)
+        print("Our Data Age Two:" + str(res))
+        print("Test: Our Reaction Time.")
+        res = analyzer.reaction_our_vectorized(
+                schedule, task_set, chain, max_phase,
+                hyper_period, max_first_read=max_first_read)
+        print("Our Reaction Time:" + str(res))
+    # Kloda analysis, assuming synchronous releases.
+    print("Test: Kloda.")
+    res = analyzer.kloda_vectorized(chain, hyper_period)
+    print("Kloda Analysis:" + str(res))
+    # Test.
+    if chain.kloda < chain.our_react:
+        if debug_flag:
+            breakpoint()
+        else:
+            raise ValueError(".kloda is shorter than .our_react")
+
+
+def analyzeChains(schedule, task_set, chains, max_phase, hyper_period,
+                  max_first_read=None, workers=1, pool=None):
+    """Call chainAnalysis() for all chains on the schedule of task_set.
+
+    With workers > 1, the chains are distributed to the worker processes of
+    pool (a concurrent.futures.ProcessPoolExecutor with workers processes),
+    or of a new pool if no pool is given. The schedule is not copied to the
+    workers, they attach to a copy in shared memory
+    (utilities.schedule.SharedSchedule). The results of our analyses and
+    Kloda are copied back to the chains.
+    """
+    if workers <= 1 or len(chains) <= 1:
+        for chain in chains:
+            chainAnalysis(schedule, task_set, chain, max_phase, hyper_period,
+                          max_first_read=max_first_read)
+        return
+    if pool is None:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            analyzeChains(schedule, task_set, chains, max_phase,
+                          hyper_period, max_first_read=max_first_read,
+                          workers=workers, pool=pool)
+        return
+
+    shared = sch.SharedSchedule.create(schedule)
+    try:
+        # One chunk of chains per worker. A chunk is pickled at once, such
+        # that the task set and the chains are sent to each worker once and
+        # the workers attach to the shared schedule by name once.
+        chunk_size = -(-len(chains) // workers)
+        outputs = pool.map(
+                _analyzeChainWorker,
+                [(shared, task_set, chains, idx, max_phase, hyper_period,
+                  max_first_read) for idx in range(len(chains))],
+                chunksize=chunk_size)
+        for chain, values in zip(chains, outputs):
+            for name, value in zip(chain_results, values):
+                setattr(chain, name, value)
+    finally:
+        shared.close()
+
+
+def _analyzeChainWorker(job):
+    """Analysis of one chain in a worker process (see analyzeChains())."""
+    (schedule, task_set, chains, idx, max_phase, hyper_period,
+     max_first_read) = job
+    chain = chains[idx]
+    chainAnalysis(schedule, task_set, chain, max_phase, hyper_period,
+                  max_first_read=max_first_read)
+    return [getattr(chain, name) for name in chain_results]
+
+
 if __name__ == '__main__':
     main()
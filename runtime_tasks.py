@@ -46,6 +46,9 @@ parser.add_argument("-timeout", type=int, default=0)
 
 # flag to plot results:
 parser.add_argument("-j", type=int, default=0)
+# scratch directory for the job arrays (memory-mapped files), empty to keep
+# them in memory:
+parser.add_argument("-scratch", type=str, default="")
 
 args = parser.parse_args()
 del parser
@@ -214,17 +217,33 @@ def main():
 
             # Event-based simulation.
             print("Simulation.")
-            simulator = es.eventSimulator(task_set)
-
-            # Stop condition: Number of jobs of lowest priority task.
-            simulator.dispatcher(
-                    int(math.ceil(sched_interval/task_set[-1].period)))
-
-            # Simulation without early completion.
-            schedule = simulator.e2e_result()
-
-            analyzer.reaction_our(schedule, task_set, ce_chain, max_phase,
-                                  hyperperiod)
+            simulator = es.eventSimulator(task_set, int_ticks=True,
+                                          scratch=args.scratch or None)
+
+            # The files of the job trace are removed after the analysis, also
+            # if it fails or times out.
+            with simulator.e2e_arrays() as schedule:
+                # Stop condition: Number of jobs of lowest priority task.
+                # The simulation stops at the first deadline miss.
+                if not simulator.dispatcher(
+                        int(math.ceil(sched_interval/task_set[-1].period)),
+                        fail_fast=True):
+                    print("Task set not schedulable: task",
+                          simulator.firstMiss[0], "misses deadline at",
+                          simulator.firstMiss[1])
+                    signal.alarm(0)
+                    continue
+
+                # Simulation without early completion.
+                if args.scratch:
+                    # The jobs are read from the files in blocks.
+                    analyzer.our_blocks(schedule, task_set, [ce_chain],
+                                        max_phase, hyperperiod,
+                                        analyses=('react',))
+                else:
+                    analyzer.reaction_our_vectorized(
+                            schedule, task_set, ce_chain, max_phase,
+                            hyperperiod)
 
             # Stop timeout alarm.
             signal.alarm(0)
@@ -286,9 +305,9 @@ def main():
 
 def TDA_check(task_set, analyzer):
     """Check if all tasks meet their deadline."""
-    for idx in range(len(task_set)):
-        task_set[idx].rt = analyzer.tda(task_set[idx], task_set[:idx])
-        if task_set[idx].rt > task_set[idx].deadline:
+    analyzer.tda_task_sets([task_set])
+    for task in task_set:
+        if task.rt > task.deadline:
             return False
     return True
 
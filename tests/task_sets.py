@@ -0,0 +1,91 @@
+"""Small fixed task sets and cause-effect chains for the tests."""
+import math
+import utilities.analyzer as a
+import utilities.chain as c
+import utilities.task as t
+
+
+def task_set_a(time_type=int):
+    """Four tasks with phases, integer parameters and no deadline miss.
+
+    With time_type=float, the same parameters are given as floats.
+    """
+    parameters = [  # phase, WCET, period
+        (0, 1, 5),
+        (1, 2, 10),
+        (0, 3, 20),
+        (2, 4, 40)]
+    return [t.Task(idx, time_type(phase), time_type(wcet), time_type(wcet),
+                   time_type(period), time_type(period), idx)
+            for idx, (phase, wcet, period) in enumerate(parameters)]
+
+
+def chains_a(task_set):
+    """Cause-effect chains of task_set_a()."""
+    t0, t1, t2, t3 = task_set
+    return [c.CauseEffectChain(0, [t2, t0, t3]),
+            c.CauseEffectChain(1, [t0, t1]),
+            c.CauseEffectChain(2, [t3, t1, t0]),
+            c.CauseEffectChain(3, [t1, t2])]
+
+
+def task_set_b():
+    """Four tasks with integer parameters, one of them with WCET = 0."""
+    parameters = [  # phase, WCET, period
+        (0, 2, 10),
+        (3, 0, 10),
+        (0, 5, 20),
+        (5, 6, 25)]
+    return [t.Task(idx, phase, wcet, wcet, period, period, idx)
+            for idx, (phase, wcet, period) in enumerate(parameters)]
+
+
+def chains_b(task_set):
+    """Cause-effect chains of task_set_b()."""
+    t0, t1, t2, t3 = task_set
+    return [c.CauseEffectChain(0, [t1, t3]),
+            c.CauseEffectChain(1, [t3, t0, t2]),
+            c.CauseEffectChain(2, [t2, t1])]
+
+
+def examples():
+    """Pairs (task_set, chains) of all examples with integer parameters."""
+    task_set = task_set_a()
+    yield task_set, chains_a(task_set)
+    task_set = task_set_b()
+    yield task_set, chains_b(task_set)
+
+
+def prepare(task_set, chains):
+    """TDA and Davare as in main.py, returns the simulation parameters.
+
+    Returns max_phase, hyper_period and the number of jobs of the lowest
+    priority task to simulate (stop condition of the simulation).
+    """
+    analyzer = a.Analyzer("0")
+    for idx, task in enumerate(task_set):
+        task.rt = analyzer.tda(task, task_set[:idx])
+    analyzer.davare([chains])
+    max_phase = max(task.phase for task in task_set)
+    max_period = max(task.period for task in task_set)
+    hyper_period = analyzer.determine_hyper_period(task_set)
+    sched_interval = (2 * hyper_period + max_phase
+                      + max(chain.davare for chain in chains) + max_period)
+    targeted_number = int(math.ceil(sched_interval / task_set[-1].period))
+    return max_phase, hyper_period, targeted_number
+
+
+def analyzed_examples():
+    """Task sets and chains of the examples with analysis results."""
+    task_sets = []
+    ce_chains = []
+    for task_set, chains in examples():
+        prepare(task_set, chains)
+        for number, chain in enumerate(chains):
+            chain.our_age = 100 + number
+            chain.our_red_age = 50 + number
+            chain.our_react = 80.5 + number
+            chain.kloda = 90 + number
+        task_sets.append(task_set)
+        ce_chains.append(chains)
+    return task_sets, ce_chains
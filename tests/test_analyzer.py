@@ -0,0 +1,171 @@
+"""The optimized analyses give the results of the original analyses."""
+import unittest
+import numpy as np
+import utilities.analyzer as a
+import utilities.event_simulator as es
+import utilities.task as t
+import task_sets as ex
+
+
+def our_scalar(analyzer, schedule, task_set, chain, max_phase, hyper_period):
+    """Data age, reduced data age and reaction time with the scalar
+    analyses."""
+    return [analyzer.max_age_our(schedule, task_set, chain, max_phase,
+                                 hyper_period, reduced=False),
+            analyzer.max_age_our(schedule, task_set, chain, max_phase,
+                                 hyper_period, reduced=True),
+            analyzer.reaction_our(schedule, task_set, chain, max_phase,
+                                  hyper_period)]
+
+
+class TestOurAnalyses(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = a.Analyzer("0")
+        # Task set, chains, max_phase, hyper_period, simulator.
+        self.examples = []
+        for task_set, chains in ex.examples():
+            max_phase, hyper_period, number = ex.prepare(task_set, chains)
+            simulator = es.eventSimulator(task_set, int_ticks=True)
+            simulator.dispatcher(number)
+            self.examples.append((task_set, chains, max_phase, hyper_period,
+                                  simulator))
+
+    def test_vectorized(self):
+        """Vectorized and scalar analyses on the schedule."""
+        for task_set, chains, max_phase, hyper_period, simulator in (
+                self.examples):
+            for chain in chains:
+                expected = our_scalar(self.analyzer, simulator.e2e_result(),
+                                      task_set, chain, max_phase,
+                                      hyper_period)
+                schedule = simulator.e2e_arrays()
+                self.assertEqual(
+                        [self.analyzer.max_age_our_vectorized(
+                                schedule, task_set, chain, max_phase,
+                                hyper_period, reduced=False),
+                         self.analyzer.max_age_our_vectorized(
+                                schedule, task_set, chain, max_phase,
+                                hyper_period, reduced=True),
+                         self.analyzer.reaction_our_vectorized(
+                                schedule, task_set, chain, max_phase,
+                                hyper_period)],
+                        expected)
+
+    def test_stream(self):
+        """Analyses on the stream of simulated jobs and on the schedule."""
+        for task_set, chains, max_phase, hyper_period, simulator in (
+                self.examples):
+            expected = []
+            for chain in chains:
+                expected += our_scalar(self.analyzer, simulator.e2e_result(),
+                                       task_set, chain, max_phase,
+                                       hyper_period)
+            _, _, number = ex.prepare(task_set, chains)
+            max_first_read = max(es.eventSimulator(
+                    task_set, int_ticks=True).firstStarts())
+            stream = es.eventSimulator(task_set, int_ticks=True)
+            self.assertEqual(
+                    self.analyzer.our_stream(
+                            stream.jobStream(number, batch=5), task_set,
+                            chains, max_phase, hyper_period, max_first_read),
+                    expected)
+
+    def test_blocks(self):
+        """Analyses on blocks of the schedule and on the complete
+        schedule."""
+        for task_set, chains, max_phase, hyper_period, simulator in (
+                self.examples):
+            expected = []
+            for chain in chains:
+                expected += our_scalar(self.analyzer, simulator.e2e_result(),
+                                       task_set, chain, max_phase,
+                                       hyper_period)
+            schedule = simulator.e2e_arrays()
+            for block in (1, 3, 65536):
+                self.assertEqual(
+                        self.analyzer.our_blocks(
+                                schedule, task_set, chains, max_phase,
+                                hyper_period, block=block),
+                        expected)
+            self.assertEqual(
+                    self.analyzer.our_blocks(
+                            schedule, task_set, chains, max_phase,
+                            hyper_period, block=3, analyses=('react',)),
+                    expected[2::3])
+
+
+class TestKloda(unittest.TestCase):
+
+    def test_vectorized(self):
+        """Vectorized and recursive Kloda analysis."""
+        analyzer = a.Analyzer("0")
+        for task_set, chains in ex.examples():
+            _, hyper_period, _ = ex.prepare(task_set, chains)
+            for chain in chains:
+                expected = analyzer.kloda(chain, hyper_period)
+                chain.kloda = 0
+                self.assertEqual(
+                        analyzer.kloda_vectorized(chain, hyper_period),
+                        expected)
+
+
+class TestTDA(unittest.TestCase):
+
+    # Periods and WCETs of task sets, sorted by priority.
+    periods = [[5, 10, 20, 40], [10, 10, 20, 25], [4, 6, 10, 15],
+               [3, 7, 11, 13]]
+    wcets = [[1, 2, 3, 4], [2, 0, 5, 6], [1, 2, 2, 1], [1, 2, 2, 2]]
+
+    def tda(self, periods, wcets):
+        """WCRTs of one task set with tda()."""
+        analyzer = a.Analyzer("0")
+        tasks = [t.Task(idx, 0, wcet, wcet, period, period, idx)
+                 for idx, (period, wcet) in enumerate(zip(periods, wcets))]
+        return [analyzer.tda(task, tasks[:idx])
+                for idx, task in enumerate(tasks)]
+
+    def test_batch(self):
+        """tda_batch() for integer and float parameters."""
+        for wcets in (np.array(self.wcets), np.array(self.wcets) * 0.9):
+            expected = [self.tda(periods, row)
+                        for periods, row in zip(self.periods, wcets.tolist())]
+            for chunk_size in (1, 7, 2**20):
+                self.assertEqual(
+                        a.Analyzer.tda_batch(self.periods, wcets,
+                                             chunk_size=chunk_size).tolist(),
+                        expected)
+            for periods, row, rts in zip(self.periods, wcets, expected):
+                self.assertEqual(a.Analyzer.tda_batch(periods, row).tolist(),
+                                 rts)
+
+    def test_deadlines(self):
+        """With deadlines, tda_batch() gives the WCRT if it meets the
+        deadline and a larger value otherwise."""
+        periods = [[5, 10, 20, 40], [4, 6, 10, 15]]
+        # The last task of the second task set misses its deadline.
+        wcets = [[1, 2, 3, 4], [2, 2, 1, 4]]
+        result = a.Analyzer.tda_batch(periods, wcets, periods).tolist()
+        for row in range(len(periods)):
+            expected = self.tda(periods[row], wcets[row])
+            for rt, wcrt, deadline in zip(result[row], expected,
+                                          periods[row]):
+                if wcrt <= deadline:
+                    self.assertEqual(rt, wcrt)
+                else:
+                    self.assertGreater(rt, deadline)
+
+    def test_task_sets(self):
+        """tda_task_sets() sets task.rt as tda()."""
+        analyzer = a.Analyzer("0")
+        task_sets = [ex.task_set_a(), ex.task_set_b(), ex.task_set_a(float)]
+        expected = [[analyzer.tda(task, task_set[:idx])
+                     for idx, task in enumerate(task_set)]
+                    for task_set in task_sets]
+        analyzer.tda_task_sets(task_sets)
+        self.assertEqual([[task.rt for task in task_set]
+                          for task_set in task_sets], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Cached analysis results are the results of the analysis."""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import main
+import utilities.cache as cch
+import utilities.event_simulator as es
+import task_sets as ex
+
+
+def chain_values(chain):
+    return ([getattr(chain, name) for name in cch.ResultCache.chain_results]
+            + [task.id for task in chain.chain])
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = cch.ResultCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_results(self):
+        """Stored results are restored for equal task sets only."""
+        task_sets, ce_chains = ex.analyzed_examples()
+        self.cache.store(task_sets[1], ce_chains[1], 'single')
+
+        task_set = ex.task_set_b()
+        chains = ex.chains_b(task_set)
+        self.assertTrue(self.cache.restore(task_set, chains, 'single'))
+        self.assertEqual([task.rt for task in task_set],
+                         [task.rt for task in task_sets[1]])
+        self.assertEqual([chain_values(chain) for chain in chains],
+                         [chain_values(chain) for chain in ce_chains[1]])
+
+        self.assertFalse(self.cache.restore(task_set, chains, 'schedule'))
+        task_set[0].wcet = 3
+        self.assertFalse(self.cache.restore(task_set, chains, 'single'))
+
+    def test_simulator(self):
+        """A stored simulator has the schedule of the original one."""
+        task_set, chains = next(ex.examples())
+        _, _, number = ex.prepare(task_set, chains)
+        simulator = es.eventSimulator(task_set, int_ticks=True)
+        simulator.dispatcher(number)
+        self.cache.store_simulator(task_set, chains, 'schedule', simulator)
+        restored = self.cache.restore_simulator(task_set, chains, 'schedule')
+        self.assertEqual(restored.e2e_result(), simulator.e2e_result())
+
+    def test_single_ECU_analysis(self):
+        """A second analysis with the cache gives the same results without
+        a simulation."""
+        results = []
+        for _ in range(2):
+            task_sets, ce_chains = map(list, zip(*ex.examples()))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                task_sets, ce_chains = main.singleECUAnalysis(
+                        task_sets, ce_chains, cache=self.cache)
+            results.append(([[task.rt for task in task_set]
+                             for task_set in task_sets],
+                            [[chain_values(chain) for chain in chains]
+                             for chains in ce_chains]))
+        # The task set with WCET = 0 is removed by singleECUAnalysis().
+        self.assertEqual(len(results[0][1]), 1)
+        self.assertEqual(results[1], results[0])
+        self.assertNotIn("Simulation.", output.getvalue())
+
+    def test_eviction(self):
+        """The least recently used entries are removed."""
+        task_sets, ce_chains = ex.analyzed_examples()
+        self.cache.store(task_sets[0], ce_chains[0], 'single')
+        size = self.cache.size
+        self.cache.max_bytes = size + size // 2
+        self.cache.store(task_sets[1], ce_chains[1], 'single')
+        self.assertFalse(self.cache.restore(task_sets[0], ce_chains[0],
+                                            'single'))
+        self.assertTrue(self.cache.restore(task_sets[1], ce_chains[1],
+                                           'single'))
+        self.assertEqual(self.cache.size, sum(
+                os.path.getsize(os.path.join(self.directory.name, name))
+                for name in os.listdir(self.directory.name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
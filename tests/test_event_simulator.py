@@ -0,0 +1,158 @@
+"""The event simulator produces the same schedule in all its modes."""
+import io
+import tempfile
+import unittest
+import utilities.batch_simulator as bs
+import utilities.event_simulator as es
+import utilities.schedule as sch
+import task_sets as ex
+
+
+def reference_schedule(tasks, targeted_number):
+    """Schedule of tasks by simulating one time unit after the other.
+
+    Preemptive fixed priority scheduling with integer parameters, stopped
+    at the targeted_number-th deadline of the lowest priority task like
+    eventSimulator.dispatcher(). The workload of an unfinished job is added
+    to the next job of the task. A job with WCET = 0 starts and ends as soon
+    as it has the highest priority of the unfinished jobs.
+    Returns the schedule in the format of eventSimulator.e2e_result().
+    """
+    low = tasks[-1]
+    stop = low.phase + (targeted_number - 1) * low.period + low.deadline
+    workload = [0] * len(tasks)
+    ready = [False] * len(tasks)
+    start = [None] * len(tasks)
+    result = dict((task, []) for task in tasks)
+    for time in range(stop):
+        for idx, task in enumerate(tasks):
+            if time >= task.phase and (time - task.phase) % task.period == 0:
+                workload[idx] += task.wcet
+                ready[idx] = True
+                start[idx] = None
+        while True:
+            active = [idx for idx in range(len(tasks)) if ready[idx]]
+            if len(active) == 0:
+                break
+            h = active[0]
+            if start[h] is None:
+                start[h] = time
+            if workload[h] > 0:
+                workload[h] -= 1
+                if workload[h] == 0:
+                    result[tasks[h]].append((start[h], time + 1))
+                    ready[h] = False
+                break
+            result[tasks[h]].append((start[h], time))
+            ready[h] = False
+    return result
+
+
+def simulate(task_set, targeted_number, int_ticks=True, **kwargs):
+    """Schedule of task_set from eventSimulator.dispatcher()."""
+    simulator = es.eventSimulator(task_set, int_ticks=int_ticks)
+    simulator.dispatcher(targeted_number, **kwargs)
+    return simulator.e2e_result()
+
+
+class TestEventSimulator(unittest.TestCase):
+
+    def test_reference(self):
+        """Event queue, ready bitmask and array trace give the schedule of
+        the step-by-step simulation."""
+        for task_set, chains in ex.examples():
+            _, _, number = ex.prepare(task_set, chains)
+            self.assertEqual(simulate(task_set, number),
+                             reference_schedule(task_set, number))
+
+    def test_arrays(self):
+        """The array trace holds the jobs of e2e_result() per task."""
+        for task_set, chains in ex.examples():
+            _, _, number = ex.prepare(task_set, chains)
+            simulator = es.eventSimulator(task_set, int_ticks=True)
+            simulator.dispatcher(number)
+            result = simulator.e2e_result()
+            schedule = simulator.e2e_arrays()
+            for task in task_set:
+                starts, ends = schedule.jobs(task)
+                self.assertEqual(list(zip(starts.tolist(), ends.tolist())),
+                                 result[task])
+            self.assertEqual(sch.Schedule.from_dict(result).to_dict(),
+                             result)
+
+    def test_float_ticks(self):
+        """Float and integer time values give the same schedule."""
+        int_set = ex.task_set_a()
+        float_set = ex.task_set_a(float)
+        _, _, number = ex.prepare(int_set, ex.chains_a(int_set))
+        int_result = simulate(int_set, number)
+        float_result = simulate(float_set, number, int_ticks=False)
+        for int_task, float_task in zip(int_set, float_set):
+            self.assertEqual(int_result[int_task], float_result[float_task])
+
+    def test_replicate(self):
+        """Replicating the hyperperiod gives the simulated schedule."""
+        for task_set, chains in ex.examples():
+            _, _, number = ex.prepare(task_set, chains)
+            self.assertEqual(simulate(task_set, number, replicate=True),
+                             simulate(task_set, number))
+
+    def test_job_stream(self):
+        """The job stream contains the jobs of the schedule in order."""
+        for task_set, chains in ex.examples():
+            _, _, number = ex.prepare(task_set, chains)
+            simulator = es.eventSimulator(task_set, int_ticks=True)
+            result = dict((task, []) for task in task_set)
+            for finished in simulator.jobStream(number, batch=7):
+                for idx, starts, ends in finished:
+                    result[task_set[idx]] += zip(starts.tolist(),
+                                                 ends.tolist())
+            self.assertEqual(result, simulate(task_set, number))
+
+    def test_checkpoint(self):
+        """A simulation continued from a checkpoint gives the schedule of
+        the uninterrupted simulation."""
+        with tempfile.TemporaryDirectory() as directory:
+            for task_set, chains in ex.examples():
+                _, hyper_period, number = ex.prepare(task_set, chains)
+                for scratch in (None, directory):
+                    simulator = es.eventSimulator(task_set, int_ticks=True)
+                    self.assertIsNone(simulator.dispatcher(
+                            number, until=hyper_period + 3))
+                    file = io.BytesIO()
+                    simulator.saveCheckpoint(file)
+                    file.seek(0)
+                    simulator = es.eventSimulator.loadCheckpoint(
+                            file, task_set, scratch=scratch)
+                    self.assertTrue(simulator.dispatcher(number))
+                    self.assertEqual(simulator.e2e_result(),
+                                     simulate(task_set, number))
+                    simulator.e2e_arrays().close()
+
+    def test_fail_fast(self):
+        """fail_fast stops at the first deadline miss."""
+        task_set = ex.task_set_a()
+        # Task 0 and 1 use the processor completely, task 2 does not start
+        # until its first deadline.
+        task_set[0].wcet = task_set[0].bcet = 4
+        simulator = es.eventSimulator(task_set, int_ticks=True)
+        self.assertFalse(simulator.dispatcher(10, fail_fast=True))
+        self.assertEqual(simulator.firstMiss, (2, 20))
+
+    def test_batch_simulator(self):
+        """With BCET = WCET, every scenario of the batch simulator has the
+        schedule of the event simulator (no deadline misses)."""
+        for task_set, chains in ex.examples():
+            _, _, number = ex.prepare(task_set, chains)
+            simulator = bs.batchSimulator(task_set, 3, seed=0,
+                                          int_ticks=True)
+            simulator.dispatcher(number)
+            self.assertEqual(simulator.missRate().tolist(),
+                             [0] * len(task_set))
+            for schedule in simulator.schedules():
+                self.assertEqual(schedule.to_dict(),
+                                 simulate(task_set, number))
+
+
+if __name__ == '__main__':
+    unittest.main()
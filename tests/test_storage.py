@@ -0,0 +1,99 @@
+"""Stored task sets, chains and analysis results are restored unchanged."""
+import os
+import tempfile
+import unittest
+import numpy as np
+import utilities.chain as c
+import utilities.storage as storage
+import utilities.task as t
+import task_sets as ex
+
+
+def task_values(task):
+    return [getattr(task, name) for name in storage.task_fields]
+
+
+def chain_values(chain):
+    return ([getattr(chain, name) for name in storage.chain_fields]
+            + [task.id for task in chain.chain])
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'task_set')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameTaskSets(self, task_sets, ce_chains, loaded_task_sets,
+                           loaded_ce_chains, linked=True):
+        self.assertEqual(
+                [[task_values(task) for task in task_set]
+                 for task_set in loaded_task_sets],
+                [[task_values(task) for task in task_set]
+                 for task_set in task_sets])
+        self.assertEqual(
+                [[chain_values(chain) for chain in chains]
+                 for chains in loaded_ce_chains],
+                [[chain_values(chain) for chain in chains]
+                 for chains in ce_chains])
+        if not linked:
+            return
+        # The chains refer to the tasks of their task set.
+        for task_set, chains in zip(loaded_task_sets, loaded_ce_chains):
+            for chain in chains:
+                for task in chain.chain:
+                    self.assertTrue(any(task is other for other in task_set))
+
+    def test_task_sets(self):
+        """Round trip of task sets and chains."""
+        task_sets, ce_chains = ex.analyzed_examples()
+        storage.save_task_sets(self.path, task_sets, ce_chains)
+        for mmap_mode in ('r', None):
+            self.assertSameTaskSets(
+                    task_sets, ce_chains,
+                    *storage.load_task_sets(self.path, mmap_mode=mmap_mode))
+
+    def test_legacy(self):
+        """Data sets with pickled objects are loaded as well.
+
+        The task sets and the chains are pickled separately, so the chains
+        refer to copies of the tasks (see main.relink_chains()).
+        """
+        task_sets, ce_chains = ex.analyzed_examples()
+        arrays = dict()
+        for name, lists in (('task_sets', task_sets), ('chains', ce_chains)):
+            arrays[name] = np.empty(len(lists), dtype=object)
+            arrays[name][:] = lists
+        np.savez(self.path + '.npz', **arrays)
+        self.assertSameTaskSets(task_sets, ce_chains,
+                                *storage.load_task_sets(self.path),
+                                linked=False)
+
+    def test_interconnected(self):
+        """Round trip of interconnected chains and their parts."""
+        task_sets, ce_chains = ex.analyzed_examples()
+        chains_single_ECU = [ce_chains[0][1], ce_chains[1][2]]
+        message = t.Task('m', 0, 1, 1, 10, 10, message=True)
+        parts = [chains_single_ECU[0], message, chains_single_ECU[1]]
+        inter = c.CauseEffectChain(
+                7, chains_single_ECU[0].chain + [message]
+                + chains_single_ECU[1].chain, parts)
+        inter.inter_our_react = 123
+        storage.save_interconnected(self.path, [inter], chains_single_ECU)
+
+        loaded_inter, loaded_single = storage.load_interconnected(self.path)
+        self.assertEqual([chain_values(chain) for chain in loaded_single],
+                         [chain_values(chain) for chain in chains_single_ECU])
+        self.assertEqual([chain_values(chain) for chain in loaded_inter],
+                         [chain_values(inter)])
+        loaded_parts = loaded_inter[0].interconnected
+        self.assertIs(loaded_parts[0], loaded_single[0])
+        self.assertEqual(task_values(loaded_parts[1]), task_values(message))
+        self.assertIs(loaded_parts[2], loaded_single[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 """End-to-End (e2e) Analysis."""
 
 import math
-import utilities.task
+import numpy as np
 import utilities.augmented_job_chain as aug
+import utilities.columnar as col
+import utilities.schedule as sch
+import utilities.stream_analysis as stream
 
 
 debug_flag = False  # flag to have breakpoint() when errors occur
@@ -14,6 +17,11 @@ class Analyzer:
     def __init__(self, e_id):
         """Creates an analyzer represented by ID."""
         self.id = e_id  # unique identifier
+        # Last schedule dictionary and its array-based version.
+        self.converted = (None, None)
+        # Augmented job chain of maximal length of the last Our analysis
+        # (only with diagnostics=True).
+        self.max_aug_job_chain = None
 
     @staticmethod
     def determine_hyper_period(task_set):
@@ -26,7 +34,7 @@ class Analyzer:
         # Compute least common multiple = hyperperiod.
         lcm = periods[0]
         for i in periods[1:]:
-            lcm = int(lcm * i / math.gcd(lcm, i))
+            lcm = lcm * i // math.gcd(lcm, i)
         return lcm
 
     @staticmethod
@@ -55,27 +63,156 @@ class Analyzer:
             else:
                 return r
 
+    @staticmethod
+    def tda_batch(periods, wcets, deadlines=None, chunk_size=2**20):
+        """TDA for all tasks of one or many task sets at once.
+
+        periods and wcets are arrays of shape (n,) for one task set or (m, n)
+        for m task sets, with the tasks of each set sorted by their priority
+        (highest priority first). Smaller task sets are padded with period
+        inf and WCET 0; the results of padding entries are meaningless.
+        The fixpoints of all tasks are iterated together. Each task with
+        WCET > 0 is warm-started with the current response time of the
+        higher priority tasks, which is a lower bound of its own WCRT.
+        With deadlines, the iteration of a task stops as soon as the response
+        time exceeds its deadline.
+        The task sets are processed in chunks, such that the temporary arrays
+        have about chunk_size entries.
+        Returns the WCRTs in the shape of periods (same values as tda(); with
+        deadlines only if they do not exceed the deadline).
+        """
+        periods = np.asarray(periods, dtype=np.float64)
+        single = periods.ndim == 1
+        periods = np.atleast_2d(periods)
+        wcets = np.atleast_2d(np.asarray(wcets))
+        if deadlines is not None:
+            deadlines = np.atleast_2d(np.asarray(deadlines))
+        active = ~np.isinf(periods)  # no padding
+        m, n = periods.shape
+        integer = np.issubdtype(wcets.dtype, np.integer)
+        if integer:
+            # Pairs of a task k and a higher priority task j, grouped by k.
+            # (The order of the summation does not matter for integers.)
+            tasks, higher = np.tril_indices(n, k=-1)
+            groups = np.arange(1, n) * np.arange(n - 1) // 2
+            step = max(1, chunk_size // max(len(tasks), 1))
+        else:
+            step = max(1, chunk_size // n)
+
+        r = wcets.copy()  # WCRT
+        for start in range(0, m if n > 1 else 0, step):
+            rows = np.arange(start, min(start + step, m))  # not finished
+            while len(rows) > 0:
+                current = r[rows]
+                c = wcets[rows]
+                # Warm start. (A task with WCET = 0 has WCRT 0 as in tda().)
+                current = np.where(
+                        c > 0, np.maximum.accumulate(current, axis=1),
+                        current)
+                # Interference of the higher priority tasks for each task.
+                i = np.zeros_like(current)
+                if integer:
+                    demand = (np.ceil(current[:, tasks]
+                                      / periods[rows][:, higher])
+                              .astype(wcets.dtype) * wcets[rows][:, higher])
+                    i[:, 1:] = np.add.reduceat(demand, groups, axis=1)
+                else:
+                    # Same order of the summation as in tda().
+                    for j in range(n - 1):
+                        i[:, j+1:] += (np.ceil(current[:, j+1:]
+                                               / periods[rows, j, np.newaxis])
+                                       * wcets[rows, j, np.newaxis])
+                grow = (current < i + c) & active[rows]
+                if deadlines is not None:
+                    grow &= current <= deadlines[rows]
+                r[rows] = np.where(grow, i + c, current)
+                rows = rows[grow.any(axis=1)]
+
+        if single:
+            return r[0]
+        return r
+
+    def tda_task_sets(self, task_sets):
+        """Batched TDA for a list of task sets.
+
+        Sets task.rt for all tasks: The WCRT if it does not exceed the
+        deadline, otherwise a value larger than the deadline.
+        """
+        task_sets = [task_set for task_set in task_sets if task_set]
+        if not task_sets:
+            return
+        n = max(len(task_set) for task_set in task_sets)
+        periods = np.full((len(task_sets), n), np.inf)
+        wcets = np.zeros((len(task_sets), n),
+                         dtype=np.result_type(*[task.wcet
+                                                for task_set in task_sets
+                                                for task in task_set]))
+        deadlines = np.full((len(task_sets), n), np.inf)
+        for row, task_set in enumerate(task_sets):
+            periods[row, :len(task_set)] = [task.period for task in task_set]
+            wcets[row, :len(task_set)] = [task.wcet for task in task_set]
+            deadlines[row, :len(task_set)] = [task.deadline
+                                              for task in task_set]
+
+        results = self.tda_batch(periods, wcets, deadlines).tolist()
+        for row, task_set in enumerate(task_sets):
+            for task, rt in zip(task_set, results[row]):
+                task.rt = rt
+
+    def array_schedule(self, schedule):
+        """Provide the schedule in array-based form.
+
+        schedule is either the dictionary from eventSimulator.e2e_result() or
+        an array-based schedule, e.g., from eventSimulator.e2e_arrays() or a
+        schedule in shared memory (utilities.schedule.SharedSchedule). The
+        latter are used directly, a dictionary is converted once and reused.
+        """
+        if isinstance(schedule, dict):
+            if self.converted[0] is not schedule:
+                self.converted = (schedule, sch.Schedule.from_dict(schedule))
+            return self.converted[1]
+        return schedule
+
     ###
     # Our analyses from 'Timing Analysis of Asynchronized Distributed
     # Cause-Effect Chains' (2021).
     ###
 
+    def first_read(self, schedule, task_set):
+        """Maximal start of the first job over all tasks of task_set.
+
+        All tasks of task_set have to be contained in the schedule.
+        """
+        schedule = self.array_schedule(schedule)
+        return max(schedule.jobs(task)[0][0] for task in task_set)
+
     def max_age_our(self, schedule, task_set, chain, max_phase, hyper_period,
-                    reduced=False):
+                    reduced=False, max_first_read=None, diagnostics=False):
         """Our maximum data age time analysis.
 
-        We construct all immediate backward augmented job chains and then
-        choose the maximal length of them.
+        We construct all immediate backward augmented job chains and keep the
+        maximal length of them.
+        With diagnostics=True, the augmented job chain of maximal length is
+        stored in self.max_aug_job_chain.
         Note: The schedule has to be build beforehand with the event scheduler.
+        If the schedule does not contain all tasks of task_set, the maximal
+        first read has to be given (see eventSimulator.firstStarts()).
         """
+        schedule = self.array_schedule(schedule)
+        self.max_aug_job_chain = None
+
         # Compute maximal first read.
-        first_jobs = []
-        for task in task_set:
-            first_jobs.append(schedule.get(task)[0])
-        max_first_read = max(first_jobs, key=lambda first_job: first_job[0])[0]
+        if max_first_read is None:
+            max_first_read = self.first_read(schedule, task_set)
+
+        # Jobs of the first and the last task in the chain.
+        starts_first, _ = schedule.jobs(chain.chain[0])
+        starts_last, ends_last = schedule.jobs(chain.chain[-1])
 
         # Construct all valid immediate backward augmented job chains.
-        candidates = []
+        max_length = None
+        max_cand = None
+        max_position = None
 
         # Position for the last job in the chain.
         position = -1
@@ -83,49 +220,46 @@ class Analyzer:
             # We start with position = 0 (1st job).
             position += 1
             # Checking for mistakes.
-            if len(schedule.get(chain.chain[-1])) < position:
+            if len(starts_last) < position:
                 if debug_flag:
                     breakpoint()
                 else:
                     return
 
-            # Last job in the job chain:
-            next_job = schedule.get(chain.chain[-1])[position]
-
             # Find actuation.
             if reduced:
-                actuation = schedule.get(chain.chain[-1])[position][1]
+                actuation = ends_last[position]
             else:
-                actuation = schedule.get(chain.chain[-1])[position+1][1]
-
-            # Construct augmented job chain with help function.
-            job_chain = self.imm_bw_jc(next_job, chain.length()-1, schedule,
-                                       chain, key=0)
+                actuation = ends_last[position+1]
+
+            # Follow the immediate backward job chain to the first task. Only
+            # the job numbers are needed for the length.
+            current = position
+            for key in range(chain.length()-2, -1, -1):
+                current = schedule.backward_links(chain.chain[key],
+                                                  chain.chain[key+1])[current]
+                if current < 0:
+                    break
 
             # Handle incomplete job chains.
-            if job_chain is None:
+            if current < 0:
                 continue
 
             # Define external activity.
-            ext_activity = job_chain[0][0]
+            ext_activity = starts_first[current]
 
             # Find first job after ext_activity
-            job_after_ext_activity = None
-            flag = False
-            for job in schedule.get(chain.chain[0]):
-                if job[0] > ext_activity:
-                    flag = True
-                    break
-            if flag is False:  # no event after ext_activity could be found
+            after = np.searchsorted(starts_first, ext_activity, side='right')
+            if after == len(starts_first):
+                # no event after ext_activity could be found
                 if debug_flag:
                     breakpoint()
                 else:
                     return
-            else:
-                job_after_ext_activity = job
+            start_after_ext_activity = starts_first[after]
 
             # Check if the augmented job chain is valid.
-            if job_after_ext_activity[0] > max_first_read:
+            if start_after_ext_activity > max_first_read:
                 pass
             else:
                 continue
@@ -136,15 +270,22 @@ class Analyzer:
             else:
                 break
 
-            # Add augmented job chain to candidates.
-            candidates.append(aug.AugJobChain(
-                    job_chain=job_chain,
-                    ext_activity=ext_activity,
-                    actuation=actuation))
-
-        # Compare length of candidates.
-        max_cand = max(candidates, key=lambda cand: cand.length())
-        max_length = max_cand.length()
+            # Compare with the longest augmented job chain so far.
+            length = actuation - ext_activity
+            if max_length is None or length > max_length:
+                max_length = length
+                max_cand = aug.AugJobChain(ext_activity=ext_activity,
+                                           actuation=actuation)
+                max_position = position
+
+        if max_length is None:
+            raise ValueError("no valid augmented job chain")
+        max_length = max_length.item()
+        if diagnostics:
+            # Construct the jobs of the longest augmented job chain.
+            max_cand.job_chain = self.imm_bw_jc(
+                    max_position, chain.length()-1, schedule, chain, key=0)
+            self.max_aug_job_chain = max_cand
 
         # Results.
         if reduced:
@@ -153,35 +294,38 @@ class Analyzer:
             chain.our_age = max_length
         return max_length
 
-    def imm_bw_jc(self, current_job, c_len, schedule, chain, key=0):
-        """Compute immediate forward job chain recursively.
+    def imm_bw_jc(self, position, c_len, schedule, chain, key=0):
+        """Compute immediate backward job chain recursively.
 
-        Used as help function for max_age_our(). Returns None if the job chain
-        is incomplete.
+        Used to construct the jobs of the longest augmented job chain in
+        max_age_our() (diagnostics). position is the number of
+        the current job in its task. The jobs are found with the link tables
+        of the schedule. Returns None if the job chain is incomplete.
         """
         # Initial case.
         if key == 0:
-            res = self.imm_bw_jc(current_job, c_len, schedule, chain,
+            res = self.imm_bw_jc(position, c_len, schedule, chain,
                                  key=key+1)
             if res is None:  # incomplete job chain
                 return None
             else:
-                return res + [current_job]  # build from right to left
+                starts, ends = schedule.jobs(chain.chain[-1])
+                # build from right to left
+                return res + [(starts[position], ends[position])]
 
         # Intermediate cases. Adding one job.
         elif key <= c_len:
-            flag_found = False
-            # Search in reversed schedule for next job.
-            for next_job in schedule.get(chain.chain[-key-1])[::-1]:
-                if current_job[0] >= next_job[1]:  # condition for next job
-                    flag_found = True
-                    break
+            # The last job that finishes before the current job starts.
+            found = schedule.backward_links(chain.chain[-key-1],
+                                            chain.chain[-key])[position]
             # Case: No job was found.
-            if flag_found is False:
+            if found < 0:
                 return None  # indicate incomplete job chain
             # Case: Job was found.
             else:
-                res = self.imm_bw_jc(next_job, c_len, schedule, chain,
+                starts, ends = schedule.jobs(chain.chain[-key-1])
+                next_job = (starts[found], ends[found])
+                res = self.imm_bw_jc(found, c_len, schedule, chain,
                                      key=key+1)
                 if res is None:  # incomplete job chain.
                     return None
@@ -192,21 +336,33 @@ class Analyzer:
         else:
             return []
 
-    def reaction_our(self, schedule, task_set, chain, max_phase, hyper_period):
+    def reaction_our(self, schedule, task_set, chain, max_phase, hyper_period,
+                     max_first_read=None, diagnostics=False):
         """Our maximum reaction time analysis.
 
-        We construct all immediate forward augmented job chains and then
-        choose the maximal length of them.
+        We construct all immediate forward augmented job chains and keep the
+        maximal length of them.
+        With diagnostics=True, the augmented job chain of maximal length is
+        stored in self.max_aug_job_chain.
         Note: The schedule has to be build beforehand with the event scheduler.
+        If the schedule does not contain all tasks of task_set, the maximal
+        first read has to be given (see eventSimulator.firstStarts()).
         """
+        schedule = self.array_schedule(schedule)
+        self.max_aug_job_chain = None
+
         # Compute maximal first read.
-        first_jobs = []
-        for task in task_set:
-            first_jobs.append(schedule.get(task)[0])
-        max_first_read = max(first_jobs, key=lambda first_job: first_job[0])[0]
+        if max_first_read is None:
+            max_first_read = self.first_read(schedule, task_set)
+
+        # Jobs of the first task in the chain.
+        starts_first, ends_first = schedule.jobs(chain.chain[0])
 
         # Construct all valid immediate forward augmented job chains.
-        candidates = []
+        _, ends_last = schedule.jobs(chain.chain[-1])
+        max_length = None
+        max_cand = None
+        max_position = None
 
         # Position for the first job in the chain.
         position = 0
@@ -216,17 +372,17 @@ class Analyzer:
             position += 1
 
             # Checking for mistakes.
-            if len(schedule.get(chain.chain[0])) < position:
+            if len(starts_first) < position:
                 if debug_flag:
                     breakpoint()
                 else:
                     return
 
             # First job in the job chain.
-            next_job = schedule.get(chain.chain[0])[position]
+            next_job = (starts_first[position], ends_first[position])
 
             # External activity.
-            ext_activity = schedule.get(chain.chain[0])[position-1][0]
+            ext_activity = starts_first[position-1]
 
             # Check if valid
             if next_job[0] > max_first_read:
@@ -240,109 +396,396 @@ class Analyzer:
             else:
                 break
 
-            # Construct augmented job chain with help function.
-            job_chain = self.imm_fw_jc(next_job, chain.length()-1, schedule,
-                                       chain, key=0)
+            # Follow the immediate forward job chain to the last task. Only
+            # the job numbers are needed for the length.
+            current = position
+            for key in range(1, chain.length()):
+                current = schedule.forward_links(chain.chain[key-1],
+                                                 chain.chain[key])[current]
+                if current == schedule.num_jobs(
+                        schedule.task_index(chain.chain[key])):
+                    print("ERROR")
+                    raise TypeError("incomplete immediate forward job chain")
 
             # Compute actuation.
-            actuation = job_chain[-1][1]
-
-            # Add augmented job chain to candidates.
-            candidates.append(aug.AugJobChain(
-                    job_chain=job_chain,
-                    ext_activity=ext_activity,
-                    actuation=actuation))
-
-        # Compare length of candidates.
-        max_cand = max(candidates, key=lambda cand: cand.length())
-        max_length = max_cand.length()
+            actuation = ends_last[current]
+
+            # Compare with the longest augmented job chain so far.
+            length = actuation - ext_activity
+            if max_length is None or length > max_length:
+                max_length = length
+                max_cand = aug.AugJobChain(ext_activity=ext_activity,
+                                           actuation=actuation)
+                max_position = position
+
+        if max_length is None:
+            raise ValueError("no valid augmented job chain")
+        max_length = max_length.item()
+        if diagnostics:
+            # Construct the jobs of the longest augmented job chain.
+            max_cand.job_chain = self.imm_fw_jc(
+                    max_position, chain.length()-1, schedule, chain, key=0)
+            self.max_aug_job_chain = max_cand
 
         # Results.
         chain.our_react = max_length
         return max_length
 
-    def imm_fw_jc(self, current_job, c_len, schedule, chain, key=0):
+    def imm_fw_jc(self, position, c_len, schedule, chain, key=0):
         """Compute immediate forward job chain recursively
 
-        Used as help function for reaction_our().
+        Used to construct the jobs of the longest augmented job chain in
+        reaction_our() (diagnostics). position is the number of
+        the current job in its task. The jobs are found with the link tables
+        of the schedule.
         """
         # Initial case.
         if key == 0:
+            starts, ends = schedule.jobs(chain.chain[0])
             # Build from left to right:
-            return [current_job] + self.imm_fw_jc(current_job, c_len, schedule,
-                                                  chain, key=key+1)
+            return [(starts[position], ends[position])] + self.imm_fw_jc(
+                    position, c_len, schedule, chain, key=key+1)
 
         # Intermediate cases. Adding one job.
         elif key <= c_len:
-            flag_found = False
-            # Search for next job.
-            for next_job in schedule.get(chain.chain[key]):
-                if current_job[1] <= next_job[0]:  # condition for next job
-                    flag_found = True
-                    break
+            starts, ends = schedule.jobs(chain.chain[key])
+            # The first job that starts after the current job finishes.
+            found = schedule.forward_links(chain.chain[key-1],
+                                           chain.chain[key])[position]
             # Case: No job was found.
-            if flag_found is False:
+            if found == len(starts):
                 print("ERROR")
             # Case: Job was found.
             else:
-                return [next_job] + self.imm_fw_jc(next_job, c_len, schedule,
+                next_job = (starts[found], ends[found])
+                return [next_job] + self.imm_fw_jc(found, c_len, schedule,
                                                    chain, key=key+1)
 
         # Final case. (key > c_len)
         else:
             return []
 
+    def our_distribution(self, schedules, task_set, chains, max_phase,
+                         hyper_period):
+        """Our analyses for a batch of schedules.
+
+        schedules are the schedules of several execution time scenarios
+        (e.g., batchSimulator.schedules()). Returns for each chain a dictionary
+        with the results of max_age_our() ('our_age' and 'our_red_age') and
+        reaction_our() ('our_react') as arrays over the scenarios. Missing
+        results are nan. The results stored at the chains are not changed.
+        """
+        names = ('our_age', 'our_red_age', 'our_react')
+        stored = [[getattr(chain, name) for name in names] for chain in chains]
+        results = [dict((name, np.empty(len(schedules))) for name in names)
+                   for chain in chains]
+        for scenario, schedule in enumerate(schedules):
+            max_first_read = self.first_read(schedule, task_set)
+            for chain, result in zip(chains, results):
+                values = (
+                    self.max_age_our_vectorized(
+                        schedule, task_set, chain, max_phase, hyper_period,
+                        reduced=False, max_first_read=max_first_read),
+                    self.max_age_our_vectorized(
+                        schedule, task_set, chain, max_phase, hyper_period,
+                        reduced=True, max_first_read=max_first_read),
+                    self.reaction_our_vectorized(
+                        schedule, task_set, chain, max_phase, hyper_period,
+                        max_first_read=max_first_read))
+                for name, value in zip(names, values):
+                    result[name][scenario] = np.nan if value is None else value
+        for chain, values in zip(chains, stored):
+            for name, value in zip(names, values):
+                setattr(chain, name, value)
+        return results
+
+    def our_stream(self, job_stream, task_set, chains, max_phase,
+                   hyper_period, max_first_read,
+                   analyses=('age', 'red_age', 'react')):
+        """Our analyses (data age, reduced data age, reaction time) on a job
+        stream.
+
+        job_stream is the generator from eventSimulator.jobStream() for the
+        tasks task_set. Only the jobs which are still needed for the
+        construction of job chains are kept, so the memory does not grow with
+        the simulated interval. The stream is closed as soon as all results
+        are known. Same results as max_age_our() and reaction_our().
+        analyses selects the analyses per chain; the results are returned in
+        this order for one chain after the other.
+        """
+        index = dict((task.id, idx) for idx, task in enumerate(task_set))
+        # Job windows of the tasks in the chains.
+        windows = dict((index[task.id], stream.JobWindow())
+                       for chain in chains for task in chain.chain)
+        streams = []
+        bound = max_phase + 2*hyper_period
+        for chain in chains:
+            tasks = [index[task.id] for task in chain.chain]
+            for kind in analyses:
+                if kind == 'react':
+                    streams.append(stream.ReactionStream(
+                            chain, tasks, windows, max_first_read, bound))
+                else:
+                    streams.append(stream.AgeStream(
+                            chain, tasks, windows, max_first_read, bound,
+                            reduced=(kind == 'red_age')))
+
+        for finished in job_stream:
+            for idx, starts, ends in finished:
+                if idx in windows:
+                    windows[idx].extend(starts, ends)
+
+            # Construct job chains and drop the jobs not needed anymore.
+            needed = dict()
+            for analysis in streams:
+                analysis.resolve()
+                if not analysis.done:
+                    for idx, number in zip(analysis.tasks, analysis.needed):
+                        needed[idx] = min(needed.get(idx, number), number)
+            if len(needed) == 0:  # all results are known
+                job_stream.close()
+                break
+            for idx, number in needed.items():
+                windows[idx].drop(number)
+        else:
+            for analysis in streams:
+                analysis.resolve(final=True)
+
+        return [analysis.result for analysis in streams]
+
+    def our_blocks(self, schedule, task_set, chains, max_phase, hyper_period,
+                   max_first_read=None, block=65536,
+                   analyses=('age', 'red_age', 'react')):
+        """Our analyses (data age, reduced data age, reaction time) on a
+        schedule in blocks of jobs.
+
+        The jobs are read block by block (see Schedule.job_stream()) and
+        analyzed with our_stream(), so only the jobs needed for further job
+        chains are kept in memory. This way, schedules in memory-mapped files
+        are analyzed with bounded memory. task_set are the tasks of the
+        schedule. analyses selects the analyses as in our_stream(). Same
+        results as max_age_our() and reaction_our().
+        """
+        schedule = self.array_schedule(schedule)
+        if max_first_read is None:
+            max_first_read = self.first_read(schedule, task_set)
+        return self.our_stream(schedule.job_stream(block), task_set, chains,
+                               max_phase, hyper_period, max_first_read,
+                               analyses)
+
+    def max_age_our_vectorized(self, schedule, task_set, chain, max_phase,
+                               hyper_period, reduced=False,
+                               max_first_read=None, diagnostics=False):
+        """Our maximum data age time analysis for all positions at once.
+
+        Same result as max_age_our(), but the immediate backward job chains
+        of all jobs of the last task are computed together by composing the
+        link tables of the schedule (see Schedule.backward_chain()). The
+        conditions of max_age_our() are applied as masks.
+        With diagnostics=True, only the job chain of maximal length is
+        constructed (stored in self.max_aug_job_chain).
+        """
+        schedule = self.array_schedule(schedule)
+        self.max_aug_job_chain = None
+
+        # Compute maximal first read.
+        if max_first_read is None:
+            max_first_read = self.first_read(schedule, task_set)
+
+        # Jobs of the first and the last task in the chain.
+        starts_first, _ = schedule.jobs(chain.chain[0])
+        _, ends_last = schedule.jobs(chain.chain[-1])
+
+        # Immediate backward job chains: Job number in the first task. (The
+        # partial job chains are shared with other chains.)
+        current = schedule.backward_chain(chain.chain)
+        complete = current >= 0
+        current = np.where(complete, current, 0)
+
+        # External activity and first job after ext_activity.
+        ext_activity = starts_first[current] if len(starts_first) > 0 else (
+                np.zeros(len(current), dtype=starts_first.dtype))
+        after = np.searchsorted(starts_first, ext_activity, side='right')
+        found = after < len(starts_first)
+        valid = complete & found
+        valid[valid] = starts_first[after[valid]] > max_first_read
+
+        # max_age_our() stops at the first position without job after
+        # ext_activity or with valid ext_activity after the end of the
+        # interval. Before that, the actuation has to exist.
+        stop = np.flatnonzero((complete & ~found)
+                              | (valid & (ext_activity >= max_phase
+                                          + 2*hyper_period)))
+        limit = len(ends_last) if reduced else len(ends_last) - 1
+        if len(stop) == 0 or stop[0] >= limit:
+            raise IndexError("schedule too short for max_age_our")
+        stop = stop[0]
+        if not found[stop]:
+            # no event after ext_activity could be found
+            if debug_flag:
+                breakpoint()
+            else:
+                return
+
+        # Lengths of the valid augmented job chains.
+        candidates = np.flatnonzero(valid[:stop])
+        if len(candidates) == 0:
+            raise ValueError("no valid augmented job chain")
+        actuation = ends_last[candidates if reduced else candidates + 1]
+        lengths = actuation - ext_activity[candidates]
+        arg = lengths.argmax()
+        max_length = lengths[arg].item()
+        if diagnostics:
+            self.max_aug_job_chain = aug.AugJobChain(
+                    self.imm_bw_jc(candidates[arg], chain.length()-1,
+                                   schedule, chain, key=0),
+                    ext_activity[candidates[arg]], actuation[arg])
+
+        # Results.
+        if reduced:
+            chain.our_red_age = max_length
+        else:
+            chain.our_age = max_length
+        return max_length
+
+    def reaction_our_vectorized(self, schedule, task_set, chain, max_phase,
+                                hyper_period, max_first_read=None,
+                                diagnostics=False):
+        """Our maximum reaction time analysis for all positions at once.
+
+        Same result as reaction_our(), but the immediate forward job chains
+        of all jobs of the first task are computed together by composing the
+        link tables of the schedule (see Schedule.forward_chain()). The
+        conditions of reaction_our() are applied as masks.
+        With diagnostics=True, only the job chain of maximal length is
+        constructed (stored in self.max_aug_job_chain).
+        """
+        schedule = self.array_schedule(schedule)
+        self.max_aug_job_chain = None
+
+        # Compute maximal first read.
+        if max_first_read is None:
+            max_first_read = self.first_read(schedule, task_set)
+
+        # Jobs of the first task in the chain.
+        starts_first, _ = schedule.jobs(chain.chain[0])
+        if len(starts_first) == 0:
+            if debug_flag:
+                breakpoint()
+            else:
+                return
+
+        # Position 1, 2, ... of the first job and its external activity.
+        ext_activity = starts_first[:-1]
+        valid = starts_first[1:] > max_first_read
+
+        # reaction_our() stops at the first valid position with external
+        # activity after the end of the interval.
+        stop = np.flatnonzero(valid
+                              & (ext_activity >= max_phase + 2*hyper_period))
+        candidates = np.flatnonzero(
+                valid[:stop[0] if len(stop) > 0 else len(valid)])
+
+        # Immediate forward job chains: Job number in the last task. (The
+        # partial job chains are shared with other chains.)
+        current = schedule.forward_chain(chain.chain)[candidates + 1]
+        if (current < 0).any():
+            print("ERROR")
+            raise TypeError("incomplete immediate forward job chain")
+
+        if len(stop) == 0:
+            raise IndexError("schedule too short for reaction_our")
+        if len(candidates) == 0:
+            raise ValueError("no valid augmented job chain")
+
+        # Lengths of the augmented job chains.
+        _, ends_last = schedule.jobs(chain.chain[-1])
+        lengths = ends_last[current] - ext_activity[candidates]
+        arg = lengths.argmax()
+        max_length = lengths[arg].item()
+        if diagnostics:
+            self.max_aug_job_chain = aug.AugJobChain(
+                    self.imm_fw_jc(candidates[arg] + 1, chain.length()-1,
+                                   schedule, chain, key=0),
+                    ext_activity[candidates[arg]], ends_last[current[arg]])
+
+        # Results.
+        chain.our_react = max_length
+        return max_length
+
     def reaction_inter_our(self, chain_set):
         """Our maximum reaction time analysis for interconnected cause-effect
         chains.
 
         Input: chain_set is a list of cause-effect chains with entry at
-        interconnected.
+        interconnected or the chains in columnar form
+        (utilities.columnar.InterconnectedColumns).
+        Returns the reaction times of all chains as array. For a list of
+        chains, they are also stored at the chains.
         Note: The chains have to be analyzed by our single ECU maximum reaction
         time analysis beforehand. ( reaction_our() )
         """
-        for chain in chain_set:
-            inter_our_react = 0  # total reaction time
-            for i in range(0, len(chain.interconnected)):
-                # Case: i is a communication task.
-                if isinstance(chain.interconnected[i], utilities.task.Task):
-                    inter_our_react += (chain.interconnected[i].period
-                                        + chain.interconnected[i].rt)
-                # Case: i is a cause-effect chain.
-                else:
-                    inter_our_react += chain.interconnected[i].our_react
-            # Store result.
-            chain.inter_our_react = inter_our_react
+        columns = self.inter_columns(chain_set)
+        # Total reaction time. Communication tasks add period + rt, local
+        # cause-effect chains their reaction time.
+        inter_our_react = np.zeros(len(columns.chains),
+                                   dtype=columns.react.dtype)
+        for pos in range(columns.index.shape[1]):
+            inter_our_react = inter_our_react + np.where(
+                    pos < columns.lengths, columns.column(columns.react, pos),
+                    0)
+        # Store result.
+        if columns is not chain_set:
+            columns.store('inter_our_react', inter_our_react)
+        return inter_our_react
 
     def max_age_inter_our(self, chain_set, reduced=False):
         """Our reduced maximum data age analysis for interconnected
         cause-effect chains.
 
         Input: chain_set is a list of cause-effect chains with entry at
-        interconnected.
+        interconnected or the chains in columnar form
+        (utilities.columnar.InterconnectedColumns).
+        Returns the data ages of all chains as array. For a list of chains,
+        they are also stored at the chains.
         Note: The chains have to be analyzed by our single ECU maximum data age
         analysis beforehand. ( max_age_our() and max_age_our(reduced=True) )
         """
-        for chain in chain_set:
-            m = len(chain.interconnected)  # chain length
-            inter_our_red_age = 0  # total data age
-            for i in range(0, m-1):
-                # Case: i is a communication task.
-                if isinstance(chain.interconnected[i], utilities.task.Task):
-                    inter_our_red_age += (chain.interconnected[i].period
-                                          + chain.interconnected[i].rt)
-                # Case: i is a cause-effect chain.
-                else:
-                    inter_our_red_age += chain.interconnected[i].our_age
+        columns = self.inter_columns(chain_set)
+        # Total data age. Communication tasks add period + rt, local
+        # cause-effect chains their data age.
+        inter_our_red_age = np.zeros(len(columns.chains),
+                                     dtype=columns.age.dtype)
+        for pos in range(columns.index.shape[1] - 1):
+            inter_our_red_age = inter_our_red_age + np.where(
+                    pos < columns.lengths - 1,
+                    columns.column(columns.age, pos), 0)
+
+        # Handle the last cause-effect chain in the list.
+        if columns.last(columns.message).any():
+            raise AttributeError("the last part of an interconnected chain"
+                                 " has to be a cause-effect chain")
+        if reduced:
+            inter_our_red_age = (inter_our_red_age
+                                 + columns.last(columns.red_age))
+        else:
+            inter_our_red_age = inter_our_red_age + columns.last(columns.age)
 
-            # Handle the last cause-effect chain in the list.
-            if reduced:
-                inter_our_red_age += chain.interconnected[m-1].our_red_age
-            else:
-                inter_our_red_age += chain.interconnected[m-1].our_age
+        # Store result.
+        if columns is not chain_set:
+            columns.store('inter_our_red_age', inter_our_red_age)
+        return inter_our_red_age
 
-            # Store result.
-            chain.inter_our_red_age = inter_our_red_age
+    @staticmethod
+    def inter_columns(chain_set):
+        """Provide interconnected chains in columnar form.
+
+        chain_set is either a list of interconnected chains or already an
+        InterconnectedColumns object, which is used directly.
+        """
+        if isinstance(chain_set, col.InterconnectedColumns):
+            return chain_set
+        return col.InterconnectedColumns(chain_set)
 
     ###
     # Davare analysis from 'Period Optimization for Hard Real-time Distributed
@@ -352,16 +795,37 @@ class Analyzer:
     def davare(self, chain_sets):
         """End-to-end latency analysis from Davare.
 
-        Input: chain_sets is a list of lists of chains.
+        Input: chain_sets is a list of lists of chains or the chains in
+        columnar form (utilities.columnar.ChainColumns).
+        Returns the latencies of all chains as array. For a list of lists of
+        chains, they are also stored at the chains.
+        """
+        columns = self.chain_columns(chain_sets)
+        # Compute the latency for all chains. (Same order of the summation
+        # as for a single chain.)
+        latency = np.zeros(len(columns.chains),
+                           dtype=np.result_type(columns.period, columns.rt))
+        for pos in range(columns.index.shape[1]):
+            valid = pos < columns.lengths
+            latency = latency + np.where(
+                    valid,
+                    (columns.column(columns.period, pos)
+                     + columns.column(columns.rt, pos)), 0)
+        # Store result.
+        if columns is not chain_sets:
+            columns.store('davare', latency)
+        return latency
+
+    @staticmethod
+    def chain_columns(chain_sets):
+        """Provide the chains in columnar form.
+
+        chain_sets is either a list of lists of chains or already a
+        ChainColumns object, which is used directly.
         """
-        for chain_set in chain_sets:
-            for chain in chain_set:
-                # Compute the latency for chain.
-                latency = 0
-                for task in chain.chain:
-                    latency += task.period + task.rt
-                # Store result.
-                chain.davare = latency
+        if isinstance(chain_sets, col.ChainColumns):
+            return chain_sets
+        return col.ChainColumns.from_chain_sets(chain_sets)
 
     ###
     # Duerr analysis from 'End-to-End Timing Analysis of Sporadic Cause-Effect
@@ -370,40 +834,63 @@ class Analyzer:
     def reaction_duerr(self, chain_sets):
         """Maximum reaction time analysis from Duerr.
 
-        Input: chain_sets is a list of lists of chains.
+        Input: chain_sets is a list of lists of chains or the chains in
+        columnar form (utilities.columnar.ChainColumns).
+        Returns the latencies of all chains as array. For a list of lists of
+        chains, they are also stored at the chains.
         """
-        for chain_set in chain_sets:
-            for chain in chain_set:
-                # Compute latency.
-                latency = chain.chain[-1].rt + chain.chain[0].period
-                for task, next_task in zip(chain.chain[:-1], chain.chain[1:]):
-                    if (task.priority > next_task.priority
-                            or next_task.message or task.message):
-                        part2 = task.rt
-                    else:
-                        part2 = 0
-                    latency += max(task.rt, next_task.period + part2)
-                # Store result.
-                chain.duerr_react = latency
+        columns = self.chain_columns(chain_sets)
+        # Compute latency.
+        latency = (columns.last(columns.rt)
+                   + columns.column(columns.period, 0))
+        for pos in range(columns.index.shape[1] - 1):
+            valid = pos + 1 < columns.lengths
+            part2 = self.duerr_part2(columns, pos)
+            latency = latency + np.where(
+                    valid,
+                    np.maximum(columns.column(columns.rt, pos),
+                               columns.column(columns.period, pos+1) + part2),
+                    0)
+        # Store result.
+        if columns is not chain_sets:
+            columns.store('duerr_react', latency)
+        return latency
 
     def age_duerr(self, chain_sets):
         """Maximum data age analysis from Duerr.
 
-        Input: chain_sets is a list of lists of chains.
+        Input: chain_sets is a list of lists of chains or the chains in
+        columnar form (utilities.columnar.ChainColumns).
+        Returns the latencies of all chains as array. For a list of lists of
+        chains, they are also stored at the chains.
+        """
+        columns = self.chain_columns(chain_sets)
+        # Compute latency.
+        latency = columns.last(columns.rt)
+        for pos in range(columns.index.shape[1] - 1):
+            valid = pos + 1 < columns.lengths
+            part2 = self.duerr_part2(columns, pos)
+            latency = latency + np.where(
+                    valid, columns.column(columns.period, pos) + part2, 0)
+        # Store result.
+        if columns is not chain_sets:
+            columns.store('duerr_age', latency)
+        return latency
+
+    @staticmethod
+    def duerr_part2(columns, pos):
+        """Response time of the producer at position pos if the consumer can
+        not start directly after the producer in Duerr's analysis.
+
+        This is the case if the producer has lower priority than the
+        consumer or if one of them is a communication task.
         """
-        for chain_set in chain_sets:
-            for chain in chain_set:
-                # Compute latency.
-                latency = chain.chain[-1].rt
-                for task, next_task in zip(chain.chain[:-1], chain.chain[1:]):
-                    if (task.priority > next_task.priority
-                            or next_task.message or task.message):
-                        part2 = task.rt
-                    else:
-                        part2 = 0
-                    latency += task.period + part2
-                # Store result.
-                chain.duerr_age = latency
+        producer = columns.column(columns.priority, pos)
+        consumer = columns.column(columns.priority, pos+1)
+        delayed = ((producer > consumer)
+                   | columns.column(columns.message, pos+1)
+                   | columns.column(columns.message, pos))
+        return np.where(delayed, columns.column(columns.rt, pos), 0)
 
     ###
     # Kloda analysis from 'Latency analysis for data chains of real-time
@@ -459,3 +946,39 @@ class Analyzer:
                         * consumer_task.period)
         return (add + rel_consumer - rel_producer
                 + self.kloda_rec(rem_chain, rel_consumer, beginning=False))
+
+    def kloda_vectorized(self, chain, hyper_period):
+        """Kloda analysis for all releases of the first task at once.
+
+        Same result as kloda(). The releases of the first task are propagated
+        through the chain as one array with a ceil division per consumer.
+        The delays repeat with the least common multiple of the periods in
+        the chain, so only the releases in the first one are considered.
+        """
+        tasks = chain.chain
+        # Releases of the first task.
+        lcm = 1
+        for task in tasks:
+            lcm = lcm * task.period // math.gcd(lcm, task.period)
+        releases = np.arange(0, min(max(1, hyper_period), lcm),
+                             tasks[0].period)
+        # Delay from the release of the first task to the current release.
+        delay = np.zeros(len(releases), dtype=releases.dtype)
+
+        for idx in range(1, len(tasks)):
+            producer_task = tasks[idx-1]
+            consumer_task = tasks[idx]
+            # Next release of the consumer (see kloda_rec()).
+            q = 0
+            if (producer_task.priority > consumer_task.priority):
+                q = producer_task.rt
+            rel_consumer = (-((-(releases + q)) // consumer_task.period)
+                            * consumer_task.period)
+            delay = delay + rel_consumer - releases
+            releases = rel_consumer
+
+        kloda = (tasks[0].period + delay.max() + tasks[-1].rt).item()
+        # Compare and store the results.
+        if chain.kloda < kloda:
+            chain.kloda = kloda
+        return chain.kloda
@@ -2,16 +2,24 @@
 
 
 class AugJobChain:
-    """Augmented job chain."""
+    """Augmented job chain.
 
-    def __init__(self, job_chain=[], ext_activity=None, actuation=None):
+    Only external activity and actuation are needed for the length. The jobs
+    are optional and only kept for diagnostics.
+    """
+
+    __slots__ = ('job_chain', 'ext_activity', 'actuation')
+
+    def __init__(self, job_chain=None, ext_activity=None, actuation=None):
         """Create an augmented job chain."""
-        self.job_chain = job_chain  # list of jobs
+        self.job_chain = job_chain  # list of jobs (optional)
         self.ext_activity = ext_activity  # external activity
         self.actuation = actuation  # actuation
 
     def add_job(self, job):
         """Add a job to the job chain."""
+        if self.job_chain is None:
+            self.job_chain = []
         self.job_chain.append(job)
 
     def set_ext_activity(self, value):
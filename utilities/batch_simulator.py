@@ -0,0 +1,217 @@
+"""Simulator for a batch of execution time scenarios.
+
+All scenarios share the releases and deadlines of the jobs. Only the
+execution times differ: Each job gets an execution time drawn uniformly
+between BCET and WCET of its task. The state of all scenarios is kept in
+arrays with one row per scenario, such that all scenarios are simulated
+together.
+"""
+import numpy as np
+import utilities.schedule as sch
+
+
+class batchSimulator:
+    """Preemptive fixed priority scheduling of periodic tasks with sampled
+    execution times for a batch of scenarios.
+
+    Same scheduling behavior as eventSimulator. Between two event times, the
+    active jobs of each scenario are executed in the order of their priority,
+    i.e., the schedule of the interval follows from the cumulative workload of
+    the higher priority tasks.
+
+    The schedule of a scenario equals the schedule of eventSimulator with the
+    same execution times only if there is no deadline miss. With a deadline
+    miss, both simulators add the remaining workload to the next job of the
+    task, but the job traces differ: eventSimulator records the times as
+    pairs of start and end in one sequence, here starts and ends are
+    recorded separately and schedule() contains only finished jobs. Check
+    missRate() before scenarios with deadline misses are analyzed.
+    """
+
+    def __init__(self, tasks, scenarios, seed=None, int_ticks=False):
+        """Initialize the batch simulator.
+
+        We assume that the tasks are sorted by their priority (highest priority
+        first).
+        scenarios is the number of execution time scenarios and seed the seed
+        for the random generator of the execution times.
+        int_ticks specifies if integer time values are used. Then phase, BCET,
+        WCET, period and deadline of all tasks have to be integers.
+        """
+        self.tasks = tasks  # list of tasks
+        self.n = len(tasks)  # number of tasks
+        self.scenarios = scenarios  # number of scenarios
+        self.rng = np.random.default_rng(seed)
+        self.int_ticks = int_ticks  # flag for integer time values
+
+        if int_ticks:
+            for task in tasks:
+                for value in (task.phase, task.bcet, task.wcet, task.period,
+                              task.deadline):
+                    if value != int(value):
+                        raise ValueError("Integer ticks require integer task"
+                                         " parameters.")
+            self.dtype = np.int64
+        else:
+            self.dtype = np.float64
+
+        self.systemTick = 0  # current time
+
+        # State of the scenarios (one row per scenario, one column per task):
+        # remaining workload, unfinished job, start of the job not recorded
+        # yet and number of deadline misses.
+        shape = (scenarios, self.n)
+        self.workload = np.zeros(shape, dtype=self.dtype)
+        self.ready = np.zeros(shape, dtype=bool)
+        self.startFlag = np.zeros(shape, dtype=bool)
+        self.misses = np.zeros(shape, dtype=np.int64)
+
+        # Number of releases and deadlines per task (same for all scenarios).
+        self.releases = np.zeros(self.n, dtype=np.int64)
+        self.deadlines = np.zeros(self.n, dtype=np.int64)
+
+        # Sampled execution times and job trace. The jobs of task idx are in
+        # the columns offsets[idx], ..., offsets[idx+1]-1. They are allocated
+        # by dispatcher().
+        self.offsets = np.zeros(self.n + 1, dtype=np.int64)
+        self.execution = None
+        self.starts = None
+        self.ends = None
+        self.numStarts = np.zeros(shape, dtype=np.int64)
+        self.numEnds = np.zeros(shape, dtype=np.int64)
+
+    def sampleExecution(self, task, number):
+        """Draw the execution times of number jobs of task for all
+        scenarios.
+        """
+        size = (self.scenarios, number)
+        if self.int_ticks:
+            return self.rng.integers(int(task.bcet), int(task.wcet),
+                                     size=size, endpoint=True)
+        return self.rng.uniform(task.bcet, task.wcet, size=size)
+
+    def dispatcher(self, targetedNumber):
+        """Main function of the scheduler.
+
+        Stops at the targetedNumber-th deadline of the lowest priority task
+        (as eventSimulator.dispatcher()). Releases at that time are not
+        processed anymore.
+        """
+        # Time of the last deadline.
+        low = self.tasks[-1]
+        stop = low.phase + (targetedNumber - 1) * low.period + low.deadline
+
+        # Releases and deadlines of all jobs until the stop.
+        times = []
+        kinds = []
+        indices = []
+        for idx, task in enumerate(self.tasks):
+            release = np.arange(task.phase, stop, task.period,
+                                dtype=self.dtype)
+            deadline = release + self.dtype(task.deadline)
+            deadline = deadline[deadline <= stop]
+            times += [deadline, release]
+            kinds += [np.ones(len(deadline), dtype=np.int8),
+                      np.zeros(len(release), dtype=np.int8)]
+            indices += [np.full(len(deadline) + len(release), idx)]
+            self.offsets[idx + 1] = self.offsets[idx] + len(release)
+        times = np.concatenate(times)
+        kinds = np.concatenate(kinds)
+        indices = np.concatenate(indices)
+
+        # Sample the execution times and allocate the job trace.
+        self.execution = np.concatenate(
+                [self.sampleExecution(task,
+                                      self.offsets[idx + 1] - self.offsets[idx])
+                 for idx, task in enumerate(self.tasks)], axis=1)
+        self.starts = np.empty_like(self.execution)
+        self.ends = np.empty_like(self.execution)
+
+        # Process the events grouped by their time. At the same time,
+        # deadlines are checked before the releases.
+        order = np.lexsort((-kinds, times))
+        times = times[order]
+        kinds = kinds[order]
+        indices = indices[order]
+        bounds = np.flatnonzero(np.diff(times)) + 1
+        for first, last in zip(np.concatenate(([0], bounds)),
+                               np.concatenate((bounds, [len(times)]))):
+            self.elapsedTime(times[first])
+            split = first + np.count_nonzero(kinds[first:last])
+            if split > first:
+                self.deadline(indices[first:split])
+            if last > split:
+                self.release(indices[split:last])
+
+    def elapsedTime(self, time):
+        """Process the elapsed time until time in all scenarios."""
+        delta = time - self.systemTick
+        if delta == 0:
+            return
+        # Workload of higher priority tasks in the interval.
+        before = np.cumsum(self.workload, axis=1) - self.workload
+        runs = self.ready & (before < delta)
+        finishes = runs & (before + self.workload <= delta)
+
+        # Record start and end of the jobs.
+        self.record(self.starts, self.numStarts, runs & self.startFlag,
+                    self.systemTick + before)
+        self.record(self.ends, self.numEnds, finishes,
+                    self.systemTick + before + self.workload)
+        self.startFlag &= ~runs
+
+        # Update the workloads.
+        self.workload = np.where(
+                finishes, 0,
+                np.where(runs, self.workload - (delta - before),
+                         self.workload))
+        self.ready &= ~finishes
+        self.systemTick = time
+
+    def record(self, trace, count, mask, values):
+        """Put values[mask] to the job trace."""
+        rows, cols = np.nonzero(mask)
+        if len(rows) == 0:
+            return
+        trace[rows, self.offsets[cols] + count[rows, cols]] = values[rows, cols]
+        count[rows, cols] += 1
+
+    def deadline(self, indices):
+        """Behavior at job deadlines of the tasks with the given indices."""
+        # Check for deadline misses. (Unfinished job.)
+        self.misses[:, indices] += self.ready[:, indices]
+        self.deadlines[indices] += 1
+
+    def release(self, indices):
+        """Behavior at job releases of the tasks with the given indices."""
+        self.workload[:, indices] += self.execution[
+                :, self.offsets[indices] + self.releases[indices]]
+        if self.int_ticks:
+            self.ready[:, indices] = True
+        else:
+            self.ready[:, indices] |= self.workload[:, indices] != 0
+        # Initialize the flag to indicate the first execution.
+        self.startFlag[:, indices] = True
+        self.releases[indices] += 1
+
+    def schedule(self, scenario):
+        """Provide the schedule of one scenario as array-based schedule
+        (utilities.schedule.Schedule).
+        """
+        starts = []
+        ends = []
+        for idx in range(self.n):
+            num = self.numEnds[scenario, idx]
+            first = self.offsets[idx]
+            starts.append(self.starts[scenario, first:first + num])
+            ends.append(self.ends[scenario, first:first + num])
+        return sch.Schedule.from_arrays(self.tasks, starts, ends)
+
+    def schedules(self):
+        """Provide the schedules of all scenarios."""
+        return [self.schedule(scenario) for scenario in range(self.scenarios)]
+
+    def missRate(self):
+        """Return the miss rate of each task over all scenarios."""
+        return (self.misses.sum(axis=0)
+                / np.maximum(self.deadlines * self.scenarios, 1))
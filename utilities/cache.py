@@ -0,0 +1,163 @@
+"""Persistent cache of analysis results of task sets."""
+import hashlib
+import os
+import numpy as np
+import utilities.event_simulator as es
+
+
+class ResultCache:
+    """Content-addressed on-disk store of analysis results.
+
+    An entry is addressed by the fingerprint of a task set and its
+    cause-effect chains (see fingerprint()). It holds the response times of
+    the tasks and the end-to-end results of the chains and, optionally, the
+    state of the simulator that produced the schedule. Each entry consists of
+    the files <key>.npz and <key>.simulator.npz in the cache directory.
+    If the files of all entries exceed max_bytes, the least recently used
+    entries are removed until they take at most low_water * max_bytes. The
+    size of the entries is tracked when they are written, the directory is
+    only scanned at the first write and when max_bytes is exceeded.
+    """
+
+    # End-to-end results stored for each chain.
+    chain_results = ('davare', 'duerr_age', 'duerr_react', 'our_age',
+                     'our_red_age', 'our_react', 'kloda')
+
+    # Fraction of max_bytes that is kept when entries are removed.
+    low_water = 0.9
+
+    def __init__(self, directory, max_bytes=2**30):
+        """Create the cache in the given directory."""
+        self.directory = directory  # location of the entries
+        self.max_bytes = max_bytes  # upper bound for the size of all entries
+        self.size = None  # size of all entries (None: not determined yet)
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(task_set, chains, kind):
+        """Key of the results of an analysis of task_set and chains.
+
+        The key is the SHA-256 hash of the analysis kind, the task
+        parameters (phase, wcet, period, deadline, priority, message) and
+        the task id sequences of the chains. The parameters are hashed as
+        float64 values, such that 5 and 5.0 lead to the same key.
+        """
+        hasher = hashlib.sha256(kind.encode())
+        hasher.update(np.array(
+                [[task.phase, task.wcet, task.period, task.deadline,
+                  task.priority, task.message] for task in task_set],
+                dtype=np.float64).tobytes())
+        hasher.update(repr([task.id for task in task_set]).encode())
+        hasher.update(repr([[task.id for task in chain.chain]
+                            for chain in chains]).encode())
+        return hasher.hexdigest()
+
+    def _path(self, key, suffix='.npz'):
+        return os.path.join(self.directory, key + suffix)
+
+    def restore(self, task_set, chains, kind):
+        """Set the cached results of task_set and chains.
+
+        task.rt is set for all tasks and the results of chain_results for
+        all chains. Returns False (and changes nothing) if there is no entry.
+        """
+        path = self._path(self.fingerprint(task_set, chains, kind))
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                rts = data['rt'].tolist()
+                results = [data[name].tolist() for name in self.chain_results]
+        except (OSError, KeyError, ValueError):
+            return False
+        self._touch(path)
+
+        for task, rt in zip(task_set, rts):
+            task.rt = rt
+        for name, values in zip(self.chain_results, results):
+            for chain, value in zip(chains, values):
+                setattr(chain, name, value)
+        return True
+
+    def store(self, task_set, chains, kind):
+        """Add the results of task_set and chains to the cache.
+
+        Results that are not numbers (e.g., None) are not stored.
+        """
+        arrays = dict(rt=np.array([task.rt for task in task_set]))
+        for name in self.chain_results:
+            arrays[name] = np.array([getattr(chain, name) for chain in chains])
+        if any(array.dtype == object for array in arrays.values()):
+            return
+        self._write(self._path(self.fingerprint(task_set, chains, kind)),
+                    lambda file: np.savez(file, **arrays))
+
+    def restore_simulator(self, task_set, chains, kind):
+        """Return the cached simulator of task_set (None if there is none)."""
+        path = self._path(self.fingerprint(task_set, chains, kind),
+                          '.simulator.npz')
+        try:
+            simulator = es.eventSimulator.loadCheckpoint(path, task_set)
+        except (OSError, KeyError, ValueError):
+            return None
+        self._touch(path)
+        return simulator
+
+    def store_simulator(self, task_set, chains, kind, simulator):
+        """Add the state of simulator to the cache."""
+        self._write(self._path(self.fingerprint(task_set, chains, kind),
+                               '.simulator.npz'),
+                    simulator.saveCheckpoint)
+
+    def _touch(self, path):
+        """Mark the entry as recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path, save):
+        """Write path with save(file) atomically and evict old entries."""
+        temp = path + '.%d.tmp' % os.getpid()
+        with open(temp, 'wb') as file:
+            save(file)
+        size = os.path.getsize(temp)
+        try:
+            size -= os.path.getsize(path)  # the entry is replaced
+        except OSError:
+            pass
+        os.replace(temp, path)
+        if self.size is not None:
+            self.size += size
+        if self.size is None or self.size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries if max_bytes is exceeded.
+
+        The size of all entries is determined from the directory.
+        """
+        entries = dict()  # key -> [last use, size, paths]
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = entries.setdefault(name.split('.')[0], [0, 0, []])
+            entry[0] = max(entry[0], stat.st_mtime)
+            entry[1] += stat.st_size
+            entry[2].append(path)
+
+        total = sum(entry[1] for entry in entries.values())
+        if total > self.max_bytes:
+            for _, size, paths in sorted(entries.values()):
+                if total <= self.low_water * self.max_bytes:
+                    break
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+        self.size = total
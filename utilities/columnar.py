@@ -0,0 +1,110 @@
+"""Columnar representation of cause-effect chains."""
+import numpy as np
+import utilities.task
+
+
+class Columns:
+    """Padded matrix of the elements of a list of chains.
+
+    Row i of index contains the element indices of the i-th chain, padded
+    with -1 after its end. Each element object gets one index, even if it is
+    used in several chains. The values of the elements are stored in one
+    array per value, indexed by the element index.
+    """
+
+    def __init__(self, chains, sequences):
+        """Create the index matrix.
+
+        sequences[i] is the list of elements of chains[i].
+        """
+        self.chains = chains  # list of chains
+        self.elements = []  # list of elements (position = element index)
+        positions = dict()  # element index per element object
+
+        self.lengths = np.array([len(sequence) for sequence in sequences],
+                                dtype=np.int64)
+        numbers = []  # element indices of all chains
+        for sequence in sequences:
+            for element in sequence:
+                idx = positions.get(id(element))
+                if idx is None:
+                    idx = positions[id(element)] = len(self.elements)
+                    self.elements.append(element)
+                numbers.append(idx)
+        width = int(self.lengths.max(initial=1))
+        self.index = np.full((len(chains), width), -1, dtype=np.int64)
+        self.index[np.arange(width) < self.lengths[:, np.newaxis]] = numbers
+
+    def column(self, values, col):
+        """Values of the elements at position col of all chains.
+
+        Entries of chains which are shorter are undefined.
+        """
+        return values[np.maximum(self.index[:, col], 0)]
+
+    def last(self, values):
+        """Values of the last element of all chains."""
+        return values[self.index[np.arange(len(self.chains)),
+                                 self.lengths - 1]]
+
+    def store(self, name, results):
+        """Store results as attribute name at the chains."""
+        for chain, value in zip(self.chains, results.tolist()):
+            setattr(chain, name, value)
+
+
+class ChainColumns(Columns):
+    """Cause-effect chains as padded matrix of task indices.
+
+    The elements are the tasks of the chains (chain.chain). The task
+    parameters period, rt, priority and message are stored as arrays.
+    """
+
+    def __init__(self, chains):
+        """Create the columns for a list of chains."""
+        super().__init__(chains, [chain.chain for chain in chains])
+        self.tasks = self.elements  # list of tasks
+
+        # Task parameters.
+        self.period = np.array([task.period for task in self.tasks])
+        self.rt = np.array([task.rt for task in self.tasks])
+        self.priority = np.array([task.priority for task in self.tasks])
+        self.message = np.array([task.message for task in self.tasks],
+                                dtype=bool)
+
+    @classmethod
+    def from_chain_sets(cls, chain_sets):
+        """Create the columns for a list of lists of chains."""
+        return cls([chain for chain_set in chain_sets for chain in chain_set])
+
+
+class InterconnectedColumns(Columns):
+    """Interconnected cause-effect chains as padded matrix of parts.
+
+    The elements are the local cause-effect chains and communication tasks
+    of the interconnected chains (chain.interconnected). For each part, the
+    latency used by our interconnected analyses is stored: For a
+    communication task period + rt, for a local chain the results of our
+    single ECU analyses (our_react, our_age and our_red_age). The results
+    of the local chains are read when the columns are created.
+    """
+
+    def __init__(self, chains):
+        """Create the columns for a list of interconnected chains."""
+        super().__init__(chains, [chain.interconnected for chain in chains])
+        self.parts = self.elements  # list of parts
+
+        # Flag for communication tasks.
+        self.message = np.array([isinstance(part, utilities.task.Task)
+                                 for part in self.parts], dtype=bool)
+        # Latencies of the parts.
+        self.react = np.array([
+                part.period + part.rt if message else part.our_react
+                for part, message in zip(self.parts, self.message)])
+        self.age = np.array([
+                part.period + part.rt if message else part.our_age
+                for part, message in zip(self.parts, self.message)])
+        # Reduced data age (only for local chains).
+        self.red_age = np.array([
+                0 if message else part.our_red_age
+                for part, message in zip(self.parts, self.message)])
@@ -4,26 +4,52 @@ Source: https://github.com/tu-dortmund-ls12-rt/MissRateSimulator/blob/master/
 simulator.py
 """
 from __future__ import division
-import operator
+import heapq
+import math
+import time
+import numpy as np
+import utilities.schedule as sch
 
 
 class eventSimulator:
     """The event simulator with periodic job behavior, fixed execution time>0,
     constrained deadline and synchronous releases for the single ECU case.
+
+    With int_ticks=True the simulator computes with exact integer time values
+    (int64) and handles execution time = 0 as well: Such a job is scheduled
+    like any other job and has the same start and end.
     """
-    def __init__(self, tasks):
+    def __init__(self, tasks, int_ticks=False, scratch=None):
         """Initialize the event simulator.
 
         We assume that the tasks are sorted by their priority (highest priority
         first).
+        int_ticks specifies if integer time values are used. Then phase, WCET,
+        period and deadline of all tasks have to be integers.
+        With a scratch directory, the job trace is kept in memory-mapped files
+        there instead of in memory (see utilities.schedule.Schedule).
         """
         self.tasks = tasks  # list of tasks
         self.h = -1  # index of the active task with the highest workload
         self.n = len(tasks)  # number of tasks
-        self.systemTick = float(0)  # current time
-
-        self.statusTable = [[float(0.0) for x in range(5)]
-                            for y in range(self.n)]
+        self.int_ticks = int_ticks  # flag for integer time values
+
+        if int_ticks:
+            for task in tasks:
+                for value in (task.phase, task.wcet, task.period,
+                              task.deadline):
+                    if value != int(value):
+                        raise ValueError("Integer ticks require integer task"
+                                         " parameters.")
+            self.timeType = int
+            dtype = np.int64
+        else:
+            self.timeType = float
+            dtype = np.float64
+
+        self.systemTick = self.timeType(0)  # current time
+
+        self.statusTable = np.zeros((self.n, 5), dtype=dtype)
         # The status table for the simulator has 5 columns per row:
         # 0. remaining workload of task
         # 1. number of release
@@ -31,28 +57,39 @@ class eventSimulator:
         # 3. number of deadlines = this should be less than release
         # 4. flag to determine starting time of a job
 
-        self.eventList = []  # List of events the simulator has to process
+        # Priority queue of events the simulator has to process. Each entry is
+        # (absolute time, sequence number, event). The sequence number keeps
+        # simultaneous events in the order in which they were created.
+        self.eventList = []
+        self.eventCount = 0  # number of events created so far
 
-        # # Sorting:
-        # tasks = sorted(tasks, key=operator.attrgetter('priority'))
+        # Ready set as bitmask: Bit i is set if and only if task i has an
+        # unfinished job, i.e., remaining workload (or a job with execution
+        # time 0 that did not run yet in the integer case). The lowest set bit
+        # is the active task with the highest priority.
+        self.readyMask = 0
 
-        # Analysis result.
-        self.raw_result = dict()
+        # Task index and time of the first deadline miss (None if there is no
+        # deadline miss).
+        self.firstMiss = None
 
-        # Fill statusTable, raw_result and eventList the first time.
+        # Analysis result. (Start and end of the jobs of each task.)
+        self.trace = sch.Schedule(tasks, dtype=dtype, directory=scratch)
+
+        # Fill statusTable and eventList the first time.
         self.initState()
 
     class eventClass(object):
         """One Event."""
-        def __init__(self, case, delta, idx):
+        def __init__(self, case, time, idx):
             """Initialize the event.
 
             case = 0 is a release and case = 1 is a deadline.
-            delta is the remaining time until the event.
+            time is the absolute time of the event.
             idx is the corresponding task index for that event.
             """
             self.eventType = case
-            self.delta = delta
+            self.time = time
             self.idx = idx
 
         def case(self):
@@ -62,113 +99,290 @@ class eventSimulator:
             elif self.eventType == 1:
                 return "deadline"
 
-        def updateDelta(self, elapsedTime):
-            """Update remaining time until the event."""
-            self.delta = self.delta - elapsedTime
-
     def tableReport(self):
         """Print eventList and statusTable."""
-        # Print eventList.
-        for i, e in enumerate(self.eventList):
+        # Print eventList in the order of processing.
+        for i, (_, _, e) in enumerate(sorted(self.eventList)):
             print("Event " + str(i) + " from task " + str(e.idx))
             print(e.case())
-            print(e.delta)
+            print(e.time)
 
         # Print statusTable.
         for x in range(self.n):
             print("task" + str(x) + ": ")
             for y in range(5):
-                print(self.statusTable[x][y])
+                print(self.statusTable[x, y])
 
     def findTheHighestWithWorkload(self):
         """Find active task with highest priority.
 
         Returns index of the task. If there is no active task, it returns -1.
         """
-        hidx = -1
-        # Find first row with non-zero entry at 0 = remaining workload
-        for i in range(self.n):
-            if self.statusTable[i][0] != 0:
-                hidx = i
-                break
-        return hidx
+        # Isolate the lowest set bit of the ready set.
+        return (self.readyMask & -self.readyMask).bit_length() - 1
+
+    def addEvent(self, case, time, idx):
+        """Put a new event to the eventList."""
+        heapq.heappush(self.eventList,
+                       (time, self.eventCount, self.eventClass(case, time, idx)))
+        self.eventCount += 1
 
     def release(self, idx):
         """Behavior at job release of task with index idx."""
+        # The release happens at the absolute time of the job:
+        release_time = (self.tasks[idx].phase
+                        + self.statusTable[idx, 1] * self.tasks[idx].period)
+
         # Set deadline event.
-        self.eventList.append(self.eventClass(
-                1, self.tasks[idx].deadline, idx))
+        self.addEvent(1, release_time + self.tasks[idx].deadline, idx)
 
         # Set next release event.
-        self.eventList.append(self.eventClass(
-                0, self.tasks[idx].period, idx))
-
-        # Sort the eventList.
-        self.eventList = sorted(self.eventList,
-                                key=operator.attrgetter('delta'))
+        self.addEvent(0, release_time + self.tasks[idx].period, idx)
 
         # Add the workload to corresponding entry in statusTable.
-        self.statusTable[idx][0] += float(self.tasks[idx].wcet)
+        self.statusTable[idx, 0] += self.timeType(self.tasks[idx].wcet)
+        if self.int_ticks or self.statusTable[idx, 0] != 0:
+            self.readyMask |= 1 << idx
 
         # Initialiue the flag to indicate the first execution.
-        self.statusTable[idx][4] = 1
+        self.statusTable[idx, 4] = 1
 
-        # Decide the highest priority task in the system.
-        self.h = self.findTheHighestWithWorkload()
-        if self.h == -1:
+        # The highest priority task is decided after all events at the same
+        # time are processed.
+        if self.readyMask == 0:
             print("BUG: after release, there must be at least one task with"
                   " workload.")
 
         # Record the job release in the statusTable.
-        self.statusTable[idx][1] += 1
+        self.statusTable[idx, 1] += 1
 
     def deadline(self, idx):
         """Behavior at job deadline of task with index idx."""
-        # Check for deadline misses.
-        if self.workload(idx) != 0:
+        # Check for deadline misses. (Unfinished job.)
+        if self.readyMask >> idx & 1:
             print("task" + str(idx) + " misses deadline")
-            self.statusTable[idx][2] += 1
-        self.statusTable[idx][3] += 1
+            self.statusTable[idx, 2] += 1
+            if self.firstMiss is None:
+                self.firstMiss = (idx, self.systemTick)
+        self.statusTable[idx, 3] += 1
 
-    def dispatcher(self, targetedNumber):
+    def dispatcher(self, targetedNumber, replicate=False, fail_fast=False,
+                   until=None, time_limit=None):
         """Main function of the scheduler.
 
         Stops when the number of released jobs of the lowest priority task is
         equal to targetedNumber.
+        With fail_fast=True, the simulation stops at the first deadline miss
+        (see firstMiss).
+        The simulation can be split into slices: It stops before the first
+        event after the simulated time until, or after time_limit seconds.
+        Calling dispatcher() again (possibly after saveCheckpoint() and
+        loadCheckpoint()) continues the simulation.
+        Returns False if the simulation stopped because of a deadline miss,
+        None if it stopped because of until or time_limit and True otherwise.
+        With replicate=True, the simulator checks at the hyperperiod boundaries
+        (after the maximal phase) if the state repeats. In that case the
+        remaining schedule is generated by shifting the already simulated
+        hyperperiod instead of simulating it job by job. (The comparison
+        starts anew with each call.)
         """
+        # Next hyperperiod boundary to check.
+        hyper_period = self.hyperPeriod() if replicate else None
+        if hyper_period is not None:
+            boundary = max(task.phase for task in self.tasks)
+            # Continued simulation: first boundary not processed yet.
+            if len(self.eventList) > 0 and self.eventList[0][0] > boundary:
+                boundary += (-(-(self.eventList[0][0] - boundary)
+                               // hyper_period) * hyper_period)
+        else:
+            boundary = None
+        snapshot = None  # state at the previous boundary
+
+        if time_limit is not None:
+            stop_time = time.monotonic() + time_limit
+
         while (targetedNumber != self.numDeadlines(self.n - 1)):
             if len(self.eventList) == 0:
                 print("BUG: there is no event in the dispatcher")
                 break
+            elif until is not None and self.eventList[0][0] > until:
+                return None
+            elif time_limit is not None and time.monotonic() > stop_time:
+                return None
             else:
                 # Get next event from the eventList.
                 e = self.getNextEvent()
-                # Process the event.
-                self.event_to_dispatch(e)
+
+                # The boundary is the release of the task with maximal phase,
+                # i.e., there is an event at the boundary.
+                if boundary is not None and e.time == boundary:
+                    # Process the elapsed time until the boundary.
+                    self.elapsedTime(e)
+                    snapshot = self.replicateHyperPeriod(
+                            snapshot, targetedNumber, e, hyper_period)
+                    if snapshot is None:  # schedule was replicated
+                        boundary = None
+                    else:
+                        boundary += hyper_period
+
+                # Process the event and all further events at the same time
+                # as one batch: The elapsed time is processed once and the
+                # highest priority task is decided once.
+                self.elapsedTime(e)
+                self.processEvent(e)
+                while (len(self.eventList) > 0
+                       and self.eventList[0][0] == e.time
+                       and targetedNumber != self.numDeadlines(self.n - 1)
+                       and not (fail_fast and self.firstMiss is not None)):
+                    self.processEvent(self.getNextEvent())
+                self.h = self.findTheHighestWithWorkload()
+
+                if fail_fast and self.firstMiss is not None:
+                    return False
+        return True
+
+    def jobStream(self, targetedNumber, batch=1024):
+        """Simulate like dispatcher() and yield the finished jobs on the fly.
+
+        After every batch events, the jobs finished so far are removed from
+        the job trace and yielded as list of tuples (idx, starts, ends) with
+        the start and end times of the jobs of task idx as arrays. Hence, the
+        job trace only holds the jobs of the current batch. Jobs finished
+        before the call (e.g., by firstStarts()) are part of the first list.
+        Each list contains all jobs which finish until the current time.
+        The schedule is not replicated.
+        """
+        count = 0  # processed events
+        while True:
+            done = targetedNumber == self.numDeadlines(self.n - 1)
+            if done or len(self.eventList) == 0 or count % batch == 0:
+                finished = [(idx,) + self.trace.pop_jobs(idx)
+                            for idx in range(self.n)
+                            if self.trace.num_entries[idx] > 1]
+                if finished:
+                    yield finished
+            if done:
+                break
+            if len(self.eventList) == 0:
+                print("BUG: there is no event in the dispatcher")
+                break
+            self.event_to_dispatch(self.getNextEvent())
+            count += 1
+
+    def firstStarts(self):
+        """Simulate until each task has started its first job.
+
+        Returns the start times of the first jobs. Only the beginning of the
+        schedule is simulated, e.g., to obtain the maximal first read of a task
+        set while the complete schedule is only simulated for a part of it.
+        Tasks which never start a job (WCET = 0 without integer ticks) are
+        omitted.
+        """
+        waiting = [idx for idx, task in enumerate(self.tasks)
+                   if self.int_ticks or task.wcet != 0]
+        while any(self.trace.num_entries[idx] == 0 for idx in waiting):
+            if len(self.eventList) == 0:
+                print("BUG: there is no event in the dispatcher")
+                break
+            self.event_to_dispatch(self.getNextEvent())
+        return [self.trace.starts[idx][0] for idx in waiting
+                if self.trace.num_entries[idx] > 0]
+
+    def hyperPeriod(self):
+        """Return the hyperperiod of the tasks.
+
+        Returns None if the periods are not integers.
+        """
+        lcm = 1
+        for task in self.tasks:
+            if task.period != int(task.period):
+                return None
+            lcm = lcm * int(task.period) // math.gcd(lcm, int(task.period))
+        return lcm
+
+    def replicateHyperPeriod(self, snapshot, targetedNumber, event,
+                             hyper_period):
+        """Compare the state at a hyperperiod boundary with the previous one.
+
+        Help function for dispatcher(). It is called at a hyperperiod boundary
+        before the events at that time are processed. event is the event
+        which is already taken from the eventList.
+        If the remaining workloads, the unfinished jobs and the pending
+        releases (relative to the boundary) are the same as at the previous
+        boundary (snapshot), the schedule repeats with the hyperperiod.
+        (Deadline events do not influence the schedule.) Then the simulator is
+        moved forward by as many hyperperiods as possible without reaching
+        targetedNumber, the job trace is filled by shifting the last simulated
+        hyperperiod and None is returned. Otherwise the current state is
+        returned as new snapshot.
+        """
+        # Pending releases relative to the boundary.
+        pending = sorted((e.time - self.systemTick, e.idx)
+                         for e in [event] + [e for _, _, e in self.eventList]
+                         if e.eventType == 0)
+        current = (self.statusTable[:, [0, 4]].copy(), self.readyMask,
+                   pending, list(self.trace.num_entries))
+        if (snapshot is None or self.readyMask != snapshot[1]
+                or pending != snapshot[2]
+                or not (current[0] == snapshot[0]).all()):
+            return current
+
+        # With deadline misses the schedule is not replicated.
+        if self.statusTable[:, 2].any():
+            return current
+
+        # Releases and deadlines of each task per hyperperiod.
+        jobs = np.array([hyper_period // int(task.period)
+                         for task in self.tasks])
+
+        # Number of hyperperiods that can be skipped.
+        skip = int((targetedNumber - 1 - self.numDeadlines(self.n - 1))
+                   // jobs[-1])
+        if skip <= 0:
+            return current
+
+        # Repeat the job trace of the last hyperperiod.
+        for idx in range(self.n):
+            self.trace.replicate(idx, snapshot[3][idx], current[3][idx],
+                                 hyper_period, skip)
+
+        # Move the simulator forward.
+        shift = skip * hyper_period
+        self.statusTable[:, 1] += skip * jobs
+        self.statusTable[:, 3] += skip * jobs
+        self.systemTick += shift
+        self.eventList = [(time + shift, count, e)
+                          for time, count, e in self.eventList]
+        for _, _, e in self.eventList:
+            e.time += shift
+        event.time += shift
+        return None
 
     def event_to_dispatch(self, event):
         """Process the given event."""
         # Process the elapsed time until the event.
         self.elapsedTime(event)
 
-        # Find the corresponding function for the event.
-        switcher = {
-            0: self.release,
-            1: self.deadline,
-        }
-        func = switcher.get(event.eventType, lambda: "ERROR")
-
         # Execute the event.
-        func(event.idx)
+        self.processEvent(event)
+
+        # Decide the highest priority task in the system.
+        self.h = self.findTheHighestWithWorkload()
+
+    def processEvent(self, event):
+        """Execute release or deadline of the given event.
+
+        The elapsed time until the event has to be processed beforehand.
+        """
+        if event.eventType == 0:
+            self.release(event.idx)
+        elif event.eventType == 1:
+            self.deadline(event.idx)
 
     def elapsedTime(self, event):
         """Process the elapsed time until the event."""
         # Determine the elapsed time until the event.
-        delta = event.delta
-
-        # Update deltas of remaining events in eventList.
-        for e in self.eventList:
-            e.updateDelta(delta)
+        delta = event.time - self.systemTick
 
         # Update the workloads in statusTable.
         while (delta):
@@ -179,44 +393,45 @@ class eventSimulator:
                 self.systemTick += delta
                 delta = 0
 
-            elif delta >= self.statusTable[self.h][0]:
+            elif delta >= self.statusTable[self.h, 0]:
                 # Case: Task with index h finishes during remaining time.
 
-                if self.statusTable[self.h][4] == 1:
+                if self.statusTable[self.h, 4] == 1:
                     # Case: First time execution of task hidx
-                    # Put start of the job to raw_result.
-                    self.raw_result[self.tasks[self.h]].append(self.systemTick)
+                    # Put start of the job to the trace.
+                    self.trace.append(self.h, self.systemTick)
                     # Set flag to 0.
-                    self.statusTable[self.h][4] = 0
+                    self.statusTable[self.h, 4] = 0
 
                 # Edit delta and systemTick.
-                delta -= self.statusTable[self.h][0]
-                self.systemTick += self.statusTable[self.h][0]
+                delta -= self.statusTable[self.h, 0]
+                self.systemTick += self.statusTable[self.h, 0]
                 # Set remaining workload to 0.
-                self.statusTable[self.h][0] = 0
+                self.statusTable[self.h, 0] = 0
+                self.readyMask &= ~(1 << self.h)
 
-                # Put finish of the job to raw_result.
-                self.raw_result[self.tasks[self.h]].append(self.systemTick)
+                # Put finish of the job to the trace.
+                self.trace.append(self.h, self.systemTick)
 
-            elif delta < self.statusTable[self.h][0]:
+            elif delta < self.statusTable[self.h, 0]:
                 # Case: Task with index h finishes not during remaining time.
 
-                if self.statusTable[self.h][4] == 1:
+                if self.statusTable[self.h, 4] == 1:
                     # Case: First time execution of task hidx
-                    # Put start of the job to raw_result.
-                    self.raw_result[self.tasks[self.h]].append(self.systemTick)
+                    # Put start of the job to the trace.
+                    self.trace.append(self.h, self.systemTick)
                     # Set flag to 0.
-                    self.statusTable[self.h][4] = 0
+                    self.statusTable[self.h, 4] = 0
 
                 # Edit remaining workload.
-                self.statusTable[self.h][0] -= delta
+                self.statusTable[self.h, 0] -= delta
                 # Edit delta and systemTick.
                 self.systemTick += delta
                 delta = 0
 
     def getNextEvent(self):
         """Get the next event from eventList."""
-        event = self.eventList.pop(0)
+        _, _, event = heapq.heappop(self.eventList)
         return event
 
     def e2e_result(self):
@@ -228,72 +443,155 @@ class eventSimulator:
         Note: The scheduler returns an empty list for a task if it has
         execution time = 0.
         """
-        # Initialize result dictionary.
-        result = dict()
-        for task in self.tasks:
-            result[task] = []
+        return self.trace.to_dict()
 
-        # Fill entries of the dictionary.
-        for task in self.tasks:
-            # Traverse the raw_result.
-            job_start = -1
-            job_end = -1
-            for x in self.raw_result[task]:
-                if (job_start < 0):  # fill start
-                    job_start = x
-                else:  # fill finish
-                    job_end = x
-                if job_start > -1 and job_end > -1:  # put job to result
-                    result[task].append((job_start, job_end))
-                    job_start = -1
-                    job_end = -1
-
-        return result
+    def e2e_arrays(self):
+        """Provide the result of the scheduler as array-based schedule.
+
+        Same content as e2e_result(), but the start and end times of the jobs
+        are kept in one array per task (utilities.schedule.Schedule). The
+        analyzer can use this result directly.
+        """
+        return self.trace
 
     def missRate(self, idx):
         """Return the miss rate of task idx."""
-        return self.statusTable[idx][2] / self.statusTable[idx][1]
+        return self.statusTable[idx, 2] / self.statusTable[idx, 1]
 
     def totalMissRate(self):
         """Return the total miss rate of the system."""
         sumRelease = 0
         sumMisses = 0
         for idx in range(self.n):
-            sumRelease += self.statusTable[idx][1]
-            sumMisses += self.statusTable[idx][2]
+            sumRelease += self.statusTable[idx, 1]
+            sumMisses += self.statusTable[idx, 2]
         return sumMisses / sumRelease
 
     def releasedJobs(self, idx):
         """Return the number of released jobs of idx task in the table."""
-        return self.statusTable[idx][1]
+        return self.statusTable[idx, 1]
 
     def numDeadlines(self, idx):
         """Return the number of past deadlines of idx task in the table."""
-        return self.statusTable[idx][3]
+        return self.statusTable[idx, 3]
 
     def releasedMisses(self, idx):
         """Return the number of misses of idx task in the table."""
-        return self.statusTable[idx][2]
+        return self.statusTable[idx, 2]
 
     def workload(self, idx):
         """Return the remaining workload of idx task in the table."""
-        return self.statusTable[idx][0]
+        return self.statusTable[idx, 0]
+
+    def saveCheckpoint(self, file):
+        """Save the state of the simulator to file (npz format).
+
+        The state consists of the status table, the current time, the
+        eventList, the ready set, the first deadline miss and the job trace so
+        far. Phase, WCET, period and deadline of the tasks are stored to check
+        that the checkpoint is loaded for the same task set.
+        """
+        events = [e for _, _, e in self.eventList]
+        dtype = self.statusTable.dtype
+        num_entries = np.array(self.trace.num_entries, dtype=np.int64)
+        # Job trace: One array of start and end values per task, written
+        # from the (possibly memory-mapped) arrays of the trace.
+        trace = dict()
+        for idx in range(self.n):
+            trace['starts_%d' % idx], trace['ends_%d' % idx] = (
+                    self.trace.values(idx))
+        np.savez(
+            file,
+            int_ticks=self.int_ticks,
+            tasks=np.array([[task.phase, task.wcet, task.period,
+                             task.deadline] for task in self.tasks],
+                           dtype=dtype).reshape(-1, 4),
+            statusTable=self.statusTable,
+            systemTick=np.array(self.systemTick, dtype=dtype),
+            h=self.h,
+            event_times=np.array([e.time for e in events], dtype=dtype),
+            event_counts=np.array([count for _, count, _ in self.eventList],
+                                  dtype=np.int64),
+            event_types=np.array([e.eventType for e in events],
+                                 dtype=np.int8),
+            event_indices=np.array([e.idx for e in events], dtype=np.int64),
+            eventCount=self.eventCount,
+            ready=np.array([self.readyMask >> idx & 1
+                            for idx in range(self.n)], dtype=bool),
+            firstMiss=np.array(self.firstMiss if self.firstMiss is not None
+                               else [], dtype=dtype),
+            num_entries=num_entries,
+            **trace)
+
+    @classmethod
+    def loadCheckpoint(cls, file, tasks, scratch=None):
+        """Create a simulator for tasks with the state saved in file.
+
+        The job trace is read piece by piece, so with a scratch directory
+        (see __init__()) it is not loaded into memory as a whole.
+        Raises ValueError if the checkpoint belongs to a different task set.
+        """
+        with np.load(file, allow_pickle=False) as data:
+            simulator = cls(tasks, int_ticks=bool(data['int_ticks']),
+                            scratch=scratch)
+            dtype = simulator.statusTable.dtype
+            params = np.array([[task.phase, task.wcet, task.period,
+                                task.deadline] for task in tasks],
+                              dtype=dtype).reshape(-1, 4)
+            if (params.shape != data['tasks'].shape
+                    or not (params == data['tasks']).all()):
+                raise ValueError("Checkpoint belongs to a different task set.")
+
+            simulator.statusTable = data['statusTable']
+            simulator.systemTick = data['systemTick'][()]
+            simulator.h = int(data['h'])
+
+            # The saved order of the eventList is a valid heap.
+            simulator.eventList = [
+                (event_time, count, cls.eventClass(case, event_time, idx))
+                for event_time, count, case, idx in zip(
+                        data['event_times'], data['event_counts'].tolist(),
+                        data['event_types'].tolist(),
+                        data['event_indices'].tolist())]
+            simulator.eventCount = int(data['eventCount'])
+
+            simulator.readyMask = sum(1 << idx for idx, ready
+                                      in enumerate(data['ready']) if ready)
+            first_miss = data['firstMiss']
+            if len(first_miss) > 0:
+                simulator.firstMiss = (int(first_miss[0]), first_miss[1])
+
+            # Job trace.
+            for idx, num in enumerate(data['num_entries'].tolist()):
+                simulator.trace.restore_values(
+                        idx, num, _pieces(data, 'starts_%d' % idx),
+                        _pieces(data, 'ends_%d' % idx))
+        return simulator
 
     def initState(self):
         """Specify the initial state of the simulator."""
-        # Make one entry for each task in the result dictionary.
-        for task in self.tasks:
-            self.raw_result[task] = []
-
         for idx in range(len(self.tasks)):
             # Fill the status Table.
-            self.statusTable[idx][0] = 0
-            self.statusTable[idx][3] = self.statusTable[idx][1]
+            self.statusTable[idx, 0] = 0
+            self.statusTable[idx, 3] = self.statusTable[idx, 1]
             # Put release events to the eventList.
-            self.eventList.append(self.eventClass(
-                    0, self.tasks[idx].phase, idx))
+            self.addEvent(0, self.tasks[idx].phase, idx)
 
-        # Sort eventList by remaining time.
-        # In case phase not 0 anymore, we need this one.
-        self.eventList = sorted(
-                self.eventList, key=operator.attrgetter('delta'))
+
+def _pieces(data, name, piece_size=sch.Schedule.piece_size):
+    """Read the array name of an npz file in pieces of piece_size values.
+
+    data is the opened npz file (numpy.load()). Help function for
+    eventSimulator.loadCheckpoint().
+    """
+    with data.zip.open(name + '.npy') as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(file)
+        remaining = shape[0]
+        while remaining > 0:
+            num = min(remaining, piece_size)
+            yield np.frombuffer(file.read(num * dtype.itemsize), dtype=dtype)
+            remaining -= num
@@ -0,0 +1,484 @@
+"""Array-based representation of schedules."""
+import os
+import shutil
+import tempfile
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class Schedule:
+    """Start and end times of the jobs of a task set.
+
+    The jobs of each task are stored in two contiguous arrays (start and end)
+    indexed by the position of the task in the task set. The arrays grow in
+    chunks while the schedule is recorded.
+    If a directory is given, the arrays are memory-mapped files in a new
+    subdirectory of it instead, such that the number of jobs is limited by
+    the disk and not by the memory. close() removes the files.
+    """
+
+    piece_size = 2**20  # maximal size of temporary arrays in replicate()
+
+    def __init__(self, tasks, dtype=np.float64, chunk_size=1024,
+                 directory=None):
+        """Create an empty schedule for the given tasks."""
+        self.tasks = tasks  # list of tasks
+        self.n = len(tasks)  # number of tasks
+        self.dtype = dtype  # data type of the time values
+        self.chunk_size = chunk_size  # minimal growth of the arrays
+        # Task ids are used for the lookup, such that copies of the task
+        # objects can be used as well.
+        self.index = dict((task.id, idx) for idx, task in enumerate(tasks))
+
+        # Location of the memory-mapped files (None: arrays in memory).
+        self.directory = (tempfile.mkdtemp(prefix='schedule_', dir=directory)
+                          if directory is not None else None)
+        self.starts = [self._array('starts', idx, chunk_size)
+                       for idx in range(self.n)]
+        self.ends = [self._array('ends', idx, chunk_size)
+                     for idx in range(self.n)]
+        self.num_entries = [0] * self.n  # recorded start and end values
+        # Cached link tables of task pairs (see backward_links()).
+        self.links = dict()
+        # Cached job chains per sequence of tasks (see backward_chain()).
+        self.chain_tables = dict()
+
+    @classmethod
+    def from_dict(cls, result):
+        """Create a schedule from the dictionary format of e2e_result()."""
+        tasks = list(result.keys())
+        jobs = [np.asarray(result[task]).reshape(-1, 2) for task in tasks]
+        return cls.from_arrays(tasks, [job[:, 0] for job in jobs],
+                               [job[:, 1] for job in jobs])
+
+    @classmethod
+    def from_arrays(cls, tasks, starts, ends):
+        """Create a schedule from the start and end times of finished jobs.
+
+        starts[idx] and ends[idx] are arrays with the values of task idx.
+        """
+        dtype = starts[0].dtype if len(starts) > 0 else np.float64
+        schedule = cls(tasks, dtype=dtype, chunk_size=0)
+        for idx in range(len(tasks)):
+            schedule.starts[idx] = np.ascontiguousarray(starts[idx])
+            schedule.ends[idx] = np.ascontiguousarray(ends[idx])
+            schedule.num_entries[idx] = 2 * len(ends[idx])
+        return schedule
+
+    def _array(self, name, idx, size):
+        """New array with size values (in memory or memory-mapped).
+
+        A memory-mapped array keeps the content of its file, i.e., the file
+        of a grown array starts with the values so far.
+        """
+        if self.directory is None:
+            return np.empty(size, dtype=self.dtype)
+        path = os.path.join(self.directory, '%s_%d.bin' % (name, idx))
+        # Empty files cannot be mapped.
+        return np.memmap(path, dtype=self.dtype, shape=max(size, 1),
+                         mode='r+' if os.path.exists(path) else 'w+')
+
+    def _grow(self, idx, size):
+        """Make sure that the arrays of task idx can hold size jobs."""
+        capacity = len(self.starts[idx])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity + max(capacity, self.chunk_size))
+        for name, arrays in (('starts', self.starts), ('ends', self.ends)):
+            if self.directory is not None:
+                arrays[idx].flush()
+                arrays[idx] = self._array(name, idx, capacity)
+                continue
+            grown = np.empty(capacity, dtype=self.dtype)
+            grown[:len(arrays[idx])] = arrays[idx]
+            arrays[idx] = grown
+
+    def append(self, idx, time):
+        """Record the next time value of task idx.
+
+        The values alternate between start and end of a job.
+        """
+        entry = self.num_entries[idx]
+        pos = entry >> 1
+        if pos >= len(self.starts[idx]):
+            self._grow(idx, pos + 1)
+        if entry & 1:
+            self.ends[idx][pos] = time
+        else:
+            self.starts[idx][pos] = time
+        self.num_entries[idx] = entry + 1
+
+    def replicate(self, idx, first, last, shift, times):
+        """Repeat recorded values of task idx.
+
+        The values with number first, ..., last-1 are appended times times,
+        shifted by shift, 2*shift, ..., times*shift. The number of values in
+        between has to be even.
+        """
+        # Start values have even number, end values have odd number.
+        window_starts = np.array(
+                self.starts[idx][(first + 1) >> 1:(last + 1) >> 1])
+        window_ends = np.array(self.ends[idx][first >> 1:last >> 1])
+        pos_starts = (last + 1) >> 1
+        pos_ends = last >> 1
+        self._grow(idx, max(pos_starts + times * len(window_starts),
+                            pos_ends + times * len(window_ends)))
+
+        # The repetitions are written in pieces of about piece_size values,
+        # so the temporary arrays stay small.
+        step = max(1, self.piece_size // max(len(window_starts), 1))
+        for done in range(0, times, step):
+            offsets = np.arange(done + 1, min(done + step, times) + 1,
+                                dtype=self.dtype) * shift
+            new_starts = (window_starts[np.newaxis, :]
+                          + offsets[:, np.newaxis]).ravel()
+            new_ends = (window_ends[np.newaxis, :]
+                        + offsets[:, np.newaxis]).ravel()
+            self.starts[idx][pos_starts:pos_starts + len(new_starts)] = (
+                    new_starts)
+            self.ends[idx][pos_ends:pos_ends + len(new_ends)] = new_ends
+            pos_starts += len(new_starts)
+            pos_ends += len(new_ends)
+        self.num_entries[idx] = last + times * (last - first)
+
+    def values(self, idx):
+        """Return all recorded start and end values of task idx.
+
+        The result are two arrays (views, no copies). The start values
+        include the start of a job which is not finished.
+        """
+        num = self.num_entries[idx]
+        return self.starts[idx][:(num + 1) >> 1], self.ends[idx][:num >> 1]
+
+    def restore_values(self, idx, num_entries, starts, ends):
+        """Record the values of task idx, which has no values yet.
+
+        starts and ends are iterables of arrays with the (num_entries + 1)
+        // 2 start and num_entries // 2 end values (e.g., read from a file
+        piece by piece), as returned by values().
+        """
+        self._grow(idx, (num_entries + 1) >> 1)
+        for arrays, pieces in ((self.starts, starts), (self.ends, ends)):
+            pos = 0
+            for piece in pieces:
+                arrays[idx][pos:pos + len(piece)] = piece
+                pos += len(piece)
+        self.num_entries[idx] = num_entries
+
+    def pop_jobs(self, idx):
+        """Remove the finished jobs of task idx and return them.
+
+        The result are two arrays with start and end times. A job which is
+        started but not finished remains in the schedule.
+        """
+        num = self.num_jobs(idx)
+        starts = self.starts[idx][:num].copy()
+        ends = self.ends[idx][:num].copy()
+        if self.num_entries[idx] & 1:
+            self.starts[idx][0] = self.starts[idx][num]
+        self.num_entries[idx] &= 1
+        self.links.clear()
+        self.chain_tables.clear()
+        return starts, ends
+
+    def job_stream(self, block=65536):
+        """Yield the finished jobs in blocks like eventSimulator.jobStream().
+
+        Each block is a list of tuples (idx, starts, ends) with the jobs of
+        task idx (copies in memory) and contains all jobs which finish until
+        the time of the block, at most about block jobs per task. Hence, a
+        schedule in memory-mapped files can be analyzed with bounded memory
+        (see Analyzer.our_blocks()).
+        """
+        positions = [0] * self.n  # number of jobs yielded so far
+        nums = [self.num_jobs(idx) for idx in range(self.n)]
+        while True:
+            remaining = [idx for idx in range(self.n)
+                         if positions[idx] < nums[idx]]
+            if len(remaining) == 0:
+                break
+            # End of the block: The first time at which a task reaches
+            # block jobs (or its last job).
+            time = min(self.ends[idx][min(positions[idx] + block,
+                                          nums[idx]) - 1]
+                       for idx in remaining)
+            finished = []
+            for idx in remaining:
+                ends = self.ends[idx][positions[idx]:nums[idx]]
+                num = int(np.searchsorted(ends, time, side='right'))
+                if num > 0:
+                    pos = positions[idx]
+                    finished.append((idx,
+                                     np.array(self.starts[idx][pos:pos + num]),
+                                     np.array(ends[:num])))
+                    positions[idx] += num
+            yield finished
+
+    def close(self):
+        """Remove the memory-mapped files (if any).
+
+        The schedule cannot be used afterwards.
+        """
+        if self.directory is not None:
+            self.starts = self.ends = None
+            self.links.clear()
+            self.chain_tables.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the schedule at the end of a with statement."""
+        self.close()
+
+    def task_index(self, task):
+        """Return the position of task in the task set."""
+        return self.index[task.id]
+
+    def num_jobs(self, idx):
+        """Return the number of finished jobs of task idx."""
+        return self.num_entries[idx] >> 1
+
+    def jobs(self, task):
+        """Return start and end times of all finished jobs of task.
+
+        The result are two arrays (views, no copies).
+        """
+        idx = self.task_index(task)
+        num = self.num_jobs(idx)
+        return self.starts[idx][:num], self.ends[idx][:num]
+
+    def backward_links(self, producer, consumer):
+        """Immediate backward jobs of producer for the jobs of consumer.
+
+        Entry j is the number of the last job of producer that finishes until
+        job j of consumer starts (-1 if there is none).
+        """
+        return self._links(producer, consumer, True)
+
+    def forward_links(self, producer, consumer):
+        """Immediate forward jobs of consumer for the jobs of producer.
+
+        Entry j is the number of the first job of consumer that starts at or
+        after the end of job j of producer (number of jobs of consumer if
+        there is none).
+        """
+        return self._links(producer, consumer, False)
+
+    def _links(self, producer, consumer, backward):
+        """Compute or reuse the link table of a task pair.
+
+        The table is computed with one sorted search over all jobs and cached
+        until the number of jobs of one of the tasks changes.
+        """
+        pidx = self.task_index(producer)
+        cidx = self.task_index(consumer)
+        key = (pidx, cidx, backward)
+        size = (self.num_entries[pidx], self.num_entries[cidx])
+        cached = self.links.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        starts_p, ends_p = self.jobs(producer)
+        starts_c, _ = self.jobs(consumer)
+        if backward:
+            table = np.searchsorted(ends_p, starts_c, side='right') - 1
+        else:
+            table = np.searchsorted(starts_c, ends_p, side='left')
+        self.links[key] = (size, table)
+        return table
+
+    def backward_chain(self, tasks):
+        """Immediate backward job chains along the sequence of tasks.
+
+        Entry j is the number of the job of tasks[0] in the immediate backward
+        job chain that ends with job j of tasks[-1] (-1 if the job chain is
+        incomplete). The result is composed from the one of tasks[1:] and is
+        cached, such that chains with a common suffix share the work.
+        """
+        key = (True,) + tuple(self.task_index(task) for task in tasks)
+        size = tuple(self.num_entries[idx] for idx in key[1:])
+        cached = self.chain_tables.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        if len(tasks) == 1:
+            table = np.arange(self.num_jobs(key[1]))
+        else:
+            table = self._compose(self.backward_links(tasks[0], tasks[1]),
+                                  self.backward_chain(tasks[1:]))
+        self.chain_tables[key] = (size, table)
+        return table
+
+    def forward_chain(self, tasks):
+        """Immediate forward job chains along the sequence of tasks.
+
+        Entry j is the number of the job of tasks[-1] in the immediate forward
+        job chain that starts with job j of tasks[0] (-1 if the job chain is
+        incomplete). The result is composed from the one of tasks[:-1] and is
+        cached, such that chains with a common prefix share the work.
+        """
+        key = (False,) + tuple(self.task_index(task) for task in tasks)
+        size = tuple(self.num_entries[idx] for idx in key[1:])
+        cached = self.chain_tables.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        if len(tasks) == 1:
+            table = np.arange(self.num_jobs(key[1]))
+        else:
+            table = self._compose(self.forward_links(tasks[-2], tasks[-1]),
+                                  self.forward_chain(tasks[:-1]))
+            # No job of tasks[-1] starts after the job of tasks[-2].
+            table[table == self.num_jobs(key[-1])] = -1
+        self.chain_tables[key] = (size, table)
+        return table
+
+    def _compose(self, links, numbers):
+        """Apply a link table to job numbers (-1 remains -1)."""
+        if len(links) == 0:
+            return np.full(len(numbers), -1)
+        return np.where(numbers >= 0, links[np.maximum(numbers, 0)], -1)
+
+    def to_dict(self):
+        """Return the schedule in the dictionary format of e2e_result().
+
+        result[task] is a list of tuples describing the start and end of each
+        job.
+        """
+        result = dict()
+        for idx, task in enumerate(self.tasks):
+            num = self.num_jobs(idx)
+            result[task] = list(zip(self.starts[idx][:num].tolist(),
+                                    self.ends[idx][:num].tolist()))
+        return result
+
+
+class SharedSchedule(Schedule):
+    """Schedule whose finished jobs are stored in one shared block.
+
+    The block is either shared memory (multiprocessing.shared_memory) or a
+    memory-mapped file. It contains a header (number of tasks, number of
+    jobs, data type), the offset table (jobs of task idx are at positions
+    offsets[idx], ..., offsets[idx+1]-1) and the flat arrays of all start
+    and end times. The arrays of the schedule are views of the block, such
+    that other processes can attach to it (by name or path) and read the
+    jobs without copying or deserializing them. Pickling transfers only the
+    tasks and the name or path.
+
+    The block is read-only in spirit: new jobs cannot be recorded. The
+    process that created the block removes it with close().
+    """
+
+    header_size = 3  # int64 values in front of the offset table
+
+    def __init__(self, tasks, name=None, path=None, owner=False):
+        """Attach to the block with the given name or path.
+
+        Use create() to make a new block and attach() in other processes.
+        """
+        self.name = name  # name of the shared memory block
+        self.path = path  # path of the memory-mapped file
+        self.owner = owner  # flag for the process that created the block
+        if path is not None:
+            self.memory = None
+            self.buffer = np.memmap(path, dtype=np.uint8,
+                                    mode='r+' if owner else 'r')
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.buffer = self.memory.buf
+
+        header = np.ndarray(self.header_size, dtype=np.int64,
+                            buffer=self.buffer)
+        n, num, code = header.tolist()
+        super().__init__(tasks, dtype=np.dtype(chr(code)), chunk_size=0)
+        if self.n != n:
+            raise ValueError("Shared schedule has %d tasks, %d given."
+                             % (n, self.n))
+
+        self.offsets = np.ndarray(n + 1, dtype=np.int64, buffer=self.buffer,
+                                  offset=8 * self.header_size)
+        data = np.ndarray(2 * num, dtype=self.dtype, buffer=self.buffer,
+                          offset=8 * (self.header_size + n + 1))
+        bounds = self.offsets.tolist()
+        for idx in range(n):
+            self.starts[idx] = data[bounds[idx]:bounds[idx + 1]]
+            self.ends[idx] = data[num + bounds[idx]:num + bounds[idx + 1]]
+            self.num_entries[idx] = 2 * (bounds[idx + 1] - bounds[idx])
+
+    @classmethod
+    def create(cls, schedule, path=None):
+        """Copy the finished jobs of schedule to a new block.
+
+        The block is shared memory, or the file path if given.
+        """
+        n = schedule.n
+        dtype = np.dtype(schedule.dtype)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([schedule.num_jobs(idx) for idx in range(n)])
+        num = int(offsets[-1])
+        size = 8 * (cls.header_size + n + 1) + 2 * num * dtype.itemsize
+
+        name = None
+        if path is not None:
+            buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=size)
+        else:
+            memory = shared_memory.SharedMemory(create=True, size=size)
+            name = memory.name
+            buffer = memory.buf
+        np.ndarray(cls.header_size, dtype=np.int64, buffer=buffer)[:] = (
+                n, num, ord(dtype.char))
+        np.ndarray(n + 1, dtype=np.int64, buffer=buffer,
+                   offset=8 * cls.header_size)[:] = offsets
+        data = np.ndarray(2 * num, dtype=dtype, buffer=buffer,
+                          offset=8 * (cls.header_size + n + 1))
+        for idx in range(n):
+            data[offsets[idx]:offsets[idx + 1]] = (
+                    schedule.starts[idx][:schedule.num_jobs(idx)])
+            data[num + offsets[idx]:num + offsets[idx + 1]] = (
+                    schedule.ends[idx][:schedule.num_jobs(idx)])
+        del data
+        if path is not None:
+            buffer.flush()
+            del buffer
+            return cls(schedule.tasks, path=path, owner=True)
+        del buffer
+        shared = cls(schedule.tasks, name=name, owner=True)
+        memory.close()  # the schedule has its own handle
+        return shared
+
+    @classmethod
+    def attach(cls, tasks, name=None, path=None):
+        """Attach to an existing block with the given name or path.
+
+        tasks are the tasks (or copies of the tasks) of the original
+        schedule in the same order.
+        """
+        return cls(tasks, name=name, path=path)
+
+    def __reduce__(self):
+        """Pickle only the tasks and the name or path of the block."""
+        return (self.attach, (self.tasks, self.name, self.path))
+
+    def _grow(self, idx, size):
+        """The arrays of a shared schedule have a fixed size."""
+        if size > len(self.starts[idx]):
+            raise ValueError("Jobs cannot be added to a shared schedule.")
+
+    def close(self):
+        """Detach from the block (and remove it in the creating process).
+
+        The schedule cannot be used afterwards.
+        """
+        self.starts = self.ends = self.offsets = None
+        self.links.clear()
+        self.chain_tables.clear()
+        self.buffer = None
+        if self.memory is not None:
+            self.memory.close()
+            if self.owner:
+                self.memory.unlink()
+        elif self.owner:
+            os.remove(self.path)
@@ -0,0 +1,289 @@
+"""Columnar on-disk format of task sets and cause-effect chains.
+
+A data set is a directory of .npy files, which can be loaded without pickle
+and with mmap_mode:
+- tasks.npy: structured array with the parameters and the response time of
+  all tasks, one task set after the other (task_set_offsets.npy).
+- chain_tasks.npy: row numbers of the tasks of all chains in tasks.npy, one
+  chain after the other (chain_offsets.npy), and one task set after the other
+  (chain_set_offsets.npy).
+- results.npy: structured array with the id and the analysis results of all
+  chains.
+Interconnected chains additionally store their parts (parts.npy and
+part_offsets.npy): a part is a local chain (row number in results.npy) or a
+communication task (row number in tasks.npy), marked in part_is_task.npy.
+
+The loaded task sets and chains are lazy lists (LazyList): The objects are
+created with their constructors when they are accessed, so the data which is
+not used stays in the (memory-mapped) arrays.
+"""
+import collections.abc
+import os
+import numpy as np
+import utilities.chain as c
+import utilities.task as t
+
+# Task parameters stored in tasks.npy.
+task_fields = ('id', 'phase', 'bcet', 'wcet', 'period', 'deadline',
+               'priority', 'message', 'rt')
+# Chain attributes stored in results.npy.
+chain_fields = ('id', 'davare', 'duerr_age', 'duerr_react', 'our_age',
+                'our_react', 'our_red_age', 'inter_our_age',
+                'inter_our_red_age', 'inter_our_react', 'kloda')
+
+
+def _table(objects, fields):
+    """Structured array with the attributes fields of objects.
+
+    The data type of each field is derived from its values. Missing results
+    (None) are stored as NaN.
+    """
+    columns = []
+    for name in fields:
+        values = [getattr(obj, name) for obj in objects]
+        column = np.array(values)
+        if column.dtype == object:
+            column = np.array([np.nan if value is None else value
+                               for value in values], dtype=np.float64)
+        columns.append(column)
+    table = np.empty(len(objects), dtype=[
+            (name, column.dtype) for name, column in zip(fields, columns)])
+    for name, column in zip(fields, columns):
+        table[name] = column
+    return table
+
+
+class LazyList(collections.abc.Sequence):
+    """List whose elements are created on first access.
+
+    create() returns the list of all elements. It is called when an element
+    is accessed for the first time; the length is known before. Elements can
+    be replaced as in a list. Pickling turns the lazy list into a regular
+    list.
+    """
+
+    def __init__(self, length, create):
+        """Create the lazy list with length elements."""
+        self.length = length  # number of elements
+        self.create = create  # function to create the elements
+        self.elements = None  # list of the elements (None: not created yet)
+
+    def _elements(self):
+        if self.elements is None:
+            self.elements = self.create()
+        return self.elements
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, idx):
+        return self._elements()[idx]
+
+    def __iter__(self):
+        return iter(self._elements())
+
+    def __setitem__(self, idx, element):
+        self._elements()[idx] = element
+
+    def __reduce__(self):
+        return (list, (self._elements(),))
+
+
+def _save(directory, **arrays):
+    """Store each array as <name>.npy in directory."""
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, name + '.npy'), array,
+                allow_pickle=False)
+
+
+def _load(directory, name, mmap_mode):
+    """Load <name>.npy from directory.
+
+    A memory-mapped array is returned as plain ndarray view, which is faster
+    to index than numpy.memmap.
+    """
+    return np.load(os.path.join(directory, name + '.npy'),
+                   mmap_mode=mmap_mode, allow_pickle=False).view(np.ndarray)
+
+
+def _task(values):
+    """Create a task from a row of tasks.npy (Python values)."""
+    (task_id, phase, bcet, wcet, period, deadline, priority, message,
+     rt) = values
+    task = t.Task(task_id, phase, bcet, wcet, period, deadline,
+                  priority=priority, message=message)
+    task.rt = rt
+    return task
+
+
+def _chain(values, chain):
+    """Create a chain from a row of results.npy (Python values)."""
+    ce_chain = c.CauseEffectChain(values[0], chain)
+    for name, value in zip(chain_fields[1:], values[1:]):
+        setattr(ce_chain, name, value)
+    return ce_chain
+
+
+def _part(elements, offsets, idx):
+    """Lazy list of the elements offsets[idx], ..., offsets[idx+1]-1."""
+    start = int(offsets[idx])
+    end = int(offsets[idx + 1])
+    return LazyList(end - start, lambda: elements[start:end])
+
+
+def _tasks(directory, mmap_mode):
+    """Lazy list of the tasks of tasks.npy."""
+    table = _load(directory, 'tasks', mmap_mode)
+    return LazyList(len(table), lambda: [
+            _task(values) for values in table.tolist()])
+
+
+def _chains(directory, mmap_mode, tasks):
+    """Lazy list of the chains of results.npy with their tasks."""
+    results = _load(directory, 'results', mmap_mode)
+    chain_tasks = _load(directory, 'chain_tasks', mmap_mode)
+    chain_offsets = _load(directory, 'chain_offsets', mmap_mode)
+
+    def create():
+        task_list = list(tasks)
+        rows = chain_tasks.tolist()
+        bounds = chain_offsets.tolist()
+        return [_chain(values, [task_list[row] for row in rows[start:end]])
+                for start, end, values in zip(bounds[:-1], bounds[1:],
+                                              results.tolist())]
+    return LazyList(len(results), create)
+
+
+def _chain_arrays(chains, tasks):
+    """Task sequences of chains as row numbers in tasks.
+
+    Returns chain_tasks and chain_offsets.
+    """
+    rows = dict((id(task), row) for row, task in enumerate(tasks))
+    lengths = [len(chain.chain) for chain in chains]
+    chain_offsets = np.zeros(len(chains) + 1, dtype=np.int64)
+    chain_offsets[1:] = np.cumsum(lengths)
+    chain_tasks = np.array([rows[id(task)] for chain in chains
+                            for task in chain.chain], dtype=np.int64)
+    return chain_tasks, chain_offsets
+
+
+def save_task_sets(directory, task_sets, ce_chains):
+    """Store task sets and their cause-effect chains in directory.
+
+    ce_chains[i] are the chains of task_sets[i]. The tasks of a chain have to
+    be contained in its task set.
+    """
+    tasks = [task for task_set in task_sets for task in task_set]
+    chains = [chain for chain_set in ce_chains for chain in chain_set]
+    chain_tasks, chain_offsets = _chain_arrays(chains, tasks)
+    _save(directory,
+          tasks=_table(tasks, task_fields),
+          task_set_offsets=np.cumsum(
+                  [0] + [len(task_set) for task_set in task_sets],
+                  dtype=np.int64),
+          chain_tasks=chain_tasks, chain_offsets=chain_offsets,
+          chain_set_offsets=np.cumsum(
+                  [0] + [len(chain_set) for chain_set in ce_chains],
+                  dtype=np.int64),
+          results=_table(chains, chain_fields))
+
+
+def load_task_sets(directory, mmap_mode='r'):
+    """Load task sets and cause-effect chains stored by save_task_sets().
+
+    Returns task_sets and ce_chains as lists of lazy lists: A task or chain
+    object is only created when it is accessed. The chains refer to the task
+    objects of their task set.
+    Data sets of older versions (<directory>.npz with pickled objects) are
+    loaded as well.
+    """
+    if not os.path.isdir(directory) and os.path.isfile(directory + '.npz'):
+        with np.load(directory + '.npz', allow_pickle=True) as data:
+            return ([list(task_set) for task_set in data['task_sets']],
+                    [list(chain_set) for chain_set in data['chains']])
+
+    tasks = _tasks(directory, mmap_mode)
+    chains = _chains(directory, mmap_mode, tasks)
+    task_set_offsets = _load(directory, 'task_set_offsets', mmap_mode)
+    chain_set_offsets = _load(directory, 'chain_set_offsets', mmap_mode)
+    return ([_part(tasks, task_set_offsets, idx)
+             for idx in range(len(task_set_offsets) - 1)],
+            [_part(chains, chain_set_offsets, idx)
+             for idx in range(len(chain_set_offsets) - 1)])
+
+
+def save_interconnected(directory, chains_inter, chains_single_ECU):
+    """Store interconnected cause-effect chains in directory.
+
+    The parts of the interconnected chains (chain.interconnected) are local
+    chains from chains_single_ECU and communication tasks.
+    """
+    # Local chains first, then the interconnected chains.
+    chains = list(chains_single_ECU) + list(chains_inter)
+    local_rows = dict((id(chain), row)
+                      for row, chain in enumerate(chains_single_ECU))
+    # All tasks of the local chains and the communication tasks.
+    tasks = []
+    task_rows = dict()
+    for chain in chains:
+        for task in chain.chain:
+            if id(task) not in task_rows:
+                task_rows[id(task)] = len(tasks)
+                tasks.append(task)
+
+    parts = [part for chain in chains_inter for part in chain.interconnected]
+    part_is_task = np.array([id(part) not in local_rows for part in parts],
+                            dtype=bool)
+    chain_tasks, chain_offsets = _chain_arrays(chains, tasks)
+    _save(directory,
+          tasks=_table(tasks, task_fields),
+          chain_tasks=chain_tasks, chain_offsets=chain_offsets,
+          results=_table(chains, chain_fields),
+          num_single=np.array(len(chains_single_ECU), dtype=np.int64),
+          parts=np.array([task_rows[id(part)] if is_task
+                          else local_rows[id(part)]
+                          for part, is_task in zip(parts, part_is_task)],
+                         dtype=np.int64),
+          part_is_task=part_is_task,
+          part_offsets=np.cumsum(
+                  [0] + [len(chain.interconnected) for chain in chains_inter],
+                  dtype=np.int64))
+
+
+def load_interconnected(directory, mmap_mode='r'):
+    """Load interconnected cause-effect chains stored by
+    save_interconnected().
+
+    Returns chains_inter and chains_single_ECU as lazy lists (see
+    load_task_sets()). Data sets of older versions (<directory>.npz with
+    pickled objects) are loaded as well.
+    """
+    if not os.path.isdir(directory) and os.path.isfile(directory + '.npz'):
+        with np.load(directory + '.npz', allow_pickle=True) as data:
+            return (list(data['chains_inter']),
+                    list(data['chains_single_ECU']))
+
+    tasks = _tasks(directory, mmap_mode)
+    chains = _chains(directory, mmap_mode, tasks)
+    num_single = int(_load(directory, 'num_single', mmap_mode))
+    part_rows = _load(directory, 'parts', mmap_mode)
+    part_is_task = _load(directory, 'part_is_task', mmap_mode)
+    part_offsets = _load(directory, 'part_offsets', mmap_mode)
+
+    def create():
+        task_list = list(tasks)
+        chain_list = list(chains)
+        # Local chains are the first rows of chains.
+        parts = [task_list[row] if is_task else chain_list[row]
+                 for row, is_task in zip(part_rows.tolist(),
+                                         part_is_task.tolist())]
+        bounds = part_offsets.tolist()
+        chains_inter = chain_list[num_single:]
+        for chain, start, end in zip(chains_inter, bounds[:-1], bounds[1:]):
+            chain.interconnected = parts[start:end]
+        return chains_inter
+
+    return (LazyList(len(chains) - num_single, create),
+            _part(chains, (0, num_single), 0))
@@ -0,0 +1,282 @@
+"""Our analyses on a stream of finished jobs.
+
+The job stream comes from eventSimulator.jobStream(). Only a window of jobs is
+kept per task: The immediate backward and forward job chains of consecutive
+positions use jobs with non-decreasing job numbers in each task, so jobs
+before the ones used by the last constructed job chains can be dropped.
+"""
+import numpy as np
+
+
+class JobWindow:
+    """Sliding window over the jobs of one task.
+
+    Jobs are added in the order of their completion and addressed by their
+    job number. Jobs can be dropped from the front.
+    """
+
+    def __init__(self, chunk_size=1024):
+        """Create an empty window.
+
+        The arrays are allocated with the data type of the first jobs.
+        """
+        self.first = 0  # number of the first stored job
+        self.head = 0  # position of the first stored job in the arrays
+        self.size = 0  # number of stored jobs
+        self.chunk_size = chunk_size
+        self.starts = None
+        self.ends = None
+
+    def count(self):
+        """Return the number of jobs added so far (including dropped)."""
+        return self.first + self.size
+
+    def extend(self, starts, ends):
+        """Add the next finished jobs."""
+        if self.starts is None:
+            self.starts = np.empty(self.chunk_size, dtype=starts.dtype)
+            self.ends = np.empty(self.chunk_size, dtype=ends.dtype)
+        needed = self.size + len(starts)
+        if self.head + needed > len(self.starts):
+            # Move the stored jobs to the front and grow if necessary.
+            capacity = len(self.starts)
+            while needed > capacity:
+                capacity *= 2
+            for name in ('starts', 'ends'):
+                old = getattr(self, name)
+                new = (old if capacity == len(old)
+                       else np.empty(capacity, dtype=old.dtype))
+                new[:self.size] = old[self.head:self.head + self.size]
+                setattr(self, name, new)
+            self.head = 0
+        pos = self.head + self.size
+        self.starts[pos:pos + len(starts)] = starts
+        self.ends[pos:pos + len(ends)] = ends
+        self.size = needed
+
+    def drop(self, number):
+        """Drop all jobs with job number smaller than number."""
+        dropped = min(number - self.first, self.size)
+        if dropped > 0:
+            self.first += dropped
+            self.head += dropped
+            self.size -= dropped
+
+    def start(self, number):
+        """Start of the job with job number number."""
+        return self.starts[self.head + number - self.first]
+
+    def end(self, number):
+        """End of the job with job number number."""
+        return self.ends[self.head + number - self.first]
+
+    def last_end_until(self, time):
+        """Number of the last job that finishes until time (or -1)."""
+        if self.size == 0:
+            return self.first - 1
+        ends = self.ends[self.head:self.head + self.size]
+        return self.first + np.searchsorted(ends, time, side='right') - 1
+
+    def first_start_from(self, time):
+        """Number of the first job that starts at or after time.
+
+        Returns count() if there is no such job yet.
+        """
+        if self.size == 0:
+            return self.first
+        starts = self.starts[self.head:self.head + self.size]
+        return self.first + np.searchsorted(starts, time, side='left')
+
+
+class AgeStream:
+    """Our maximum data age analysis on a job stream.
+
+    Same result as Analyzer.max_age_our().
+    """
+
+    def __init__(self, chain, tasks, windows, max_first_read, bound,
+                 reduced=False):
+        """Create the analysis.
+
+        tasks are the task indices of the chain and windows the job windows
+        of all tasks. bound is max_phase + 2*hyper_period.
+        """
+        self.chain = chain
+        self.tasks = tasks
+        self.windows = windows
+        self.max_first_read = max_first_read
+        self.bound = bound
+        self.reduced = reduced
+        self.position = 0  # position of the last job of the next job chain
+        self.needed = [0] * len(tasks)  # first needed job number per task
+        self.max_length = None  # maximal length so far
+        self.done = False
+        self.result = None
+
+    def resolve(self, final=False):
+        """Construct the job chains for which all jobs are known.
+
+        final indicates that the stream has ended.
+        """
+        last = self.windows[self.tasks[-1]]
+        first = self.windows[self.tasks[0]]
+        while not self.done:
+            position = self.position
+            # Last job in the job chain and actuation.
+            if last.count() <= position + (0 if self.reduced else 1):
+                if final:
+                    raise IndexError("job stream ended before the last job"
+                                     " of the chain")
+                return
+            current = position
+
+            # Construct immediate backward job chain. All jobs that finish
+            # before the start of a known job are known.
+            found = [0] * len(self.tasks)
+            found[-1] = position
+            for key in range(len(self.tasks) - 2, -1, -1):
+                current = self.windows[self.tasks[key]].last_end_until(
+                        self.windows[self.tasks[key + 1]].start(current))
+                if current < 0:  # incomplete job chain
+                    break
+                found[key] = current
+            if current < 0:
+                self.position += 1
+                continue
+
+            # External activity and the next job of the first task.
+            ext_activity = first.start(current)
+            if first.count() <= current + 1:
+                # At the end of the stream, there is no job after
+                # ext_activity. (No result as in max_age_our().)
+                self.done = final
+                return
+
+            # Check if the augmented job chain is valid.
+            if first.start(current + 1) > self.max_first_read:
+                pass
+            else:
+                self.position += 1
+                self.needed = found
+                continue
+
+            # End condition.
+            if ext_activity < self.bound:
+                pass
+            else:
+                self.finish()
+                return
+
+            if self.reduced:
+                actuation = last.end(position)
+            else:
+                actuation = last.end(position + 1)
+            length = actuation - ext_activity
+            if self.max_length is None or length > self.max_length:
+                self.max_length = length
+            self.position += 1
+            self.needed = found
+
+    def finish(self):
+        """Store the result at the chain."""
+        self.done = True
+        if self.max_length is None:
+            raise ValueError("no valid augmented job chain")
+        self.result = self.max_length.item()
+        if self.reduced:
+            self.chain.our_red_age = self.result
+        else:
+            self.chain.our_age = self.result
+
+
+class ReactionStream:
+    """Our maximum reaction time analysis on a job stream.
+
+    Same result as Analyzer.reaction_our().
+    """
+
+    def __init__(self, chain, tasks, windows, max_first_read, bound):
+        """Create the analysis.
+
+        tasks are the task indices of the chain and windows the job windows
+        of all tasks. bound is max_phase + 2*hyper_period.
+        """
+        self.chain = chain
+        self.tasks = tasks
+        self.windows = windows
+        self.max_first_read = max_first_read
+        self.bound = bound
+        # Position of the first job of the next job chain. (We start with the
+        # 2nd job because we need one previous job for the definition of
+        # external activity.)
+        self.position = 1
+        self.needed = [0] * len(tasks)  # first needed job number per task
+        self.max_length = None  # maximal length so far
+        self.done = False
+        self.result = None
+
+    def resolve(self, final=False):
+        """Construct the job chains for which all jobs are known.
+
+        final indicates that the stream has ended.
+        """
+        first = self.windows[self.tasks[0]]
+        while not self.done:
+            position = self.position
+            # First job in the job chain.
+            if first.count() <= position:
+                if final:
+                    if first.count() < position:
+                        self.done = True
+                        return
+                    raise IndexError("job stream ended before the first job"
+                                     " of the chain")
+                return
+
+            # External activity.
+            ext_activity = first.start(position - 1)
+
+            # Check if valid
+            if first.start(position) > self.max_first_read:
+                pass
+            else:
+                self.position += 1
+                continue
+
+            # End condition.
+            if ext_activity < self.bound:
+                pass
+            else:
+                self.finish()
+                return
+
+            # Construct immediate forward job chain. The first job that starts
+            # after a given time is known as soon as it is finished.
+            found = [position - 1] + [0] * (len(self.tasks) - 1)
+            current = position
+            for key in range(1, len(self.tasks)):
+                window = self.windows[self.tasks[key]]
+                current = window.first_start_from(
+                        self.windows[self.tasks[key - 1]].end(current))
+                if current == window.count():
+                    if final:
+                        raise ValueError("job stream ended before the job"
+                                         " chain is complete")
+                    return
+                found[key] = current
+
+            # Actuation.
+            actuation = self.windows[self.tasks[-1]].end(current)
+            length = actuation - ext_activity
+            if self.max_length is None or length > self.max_length:
+                self.max_length = length
+            self.position += 1
+            self.needed = found
+
+    def finish(self):
+        """Store the result at the chain."""
+        self.done = True
+        if self.max_length is None:
+            raise ValueError("no valid augmented job chain")
+        self.result = self.max_length.item()
+        self.chain.our_react = self.result